@@ -0,0 +1,56 @@
+ROLE_ORG_ADMIN = "ORG_ADMIN"
+ROLE_HR_MANAGER = "HR_MANAGER"
+ROLE_EMPLOYEE = "EMPLOYEE"
+
+
+class AccessContext:
+    """
+    Role set, employee profile and organization of a user.
+
+    Built once per request by AccessContextMiddleware so that views and admin
+    hooks do not re-query groups and employee_profile on every check.
+    """
+
+    def __init__(self, *, is_superuser: bool, roles=frozenset(), employee=None):
+        self.is_superuser = is_superuser
+        self.roles = frozenset(roles)
+        self.employee = employee
+
+    @classmethod
+    def for_user(cls, user) -> "AccessContext":
+        if user is None or not user.is_authenticated:
+            return cls(is_superuser=False)
+
+        roles = user.groups.values_list("name", flat=True)
+        employee = getattr(user, "employee_profile", None)
+        return cls(is_superuser=user.is_superuser, roles=roles, employee=employee)
+
+    @property
+    def employee_id(self):
+        return self.employee.pk if self.employee is not None else None
+
+    @property
+    def organization_id(self):
+        return self.employee.organization_id if self.employee is not None else None
+
+    @property
+    def is_employee_role(self) -> bool:
+        return ROLE_EMPLOYEE in self.roles
+
+    def has_role(self, name: str) -> bool:
+        return name in self.roles
+
+    def __repr__(self) -> str:
+        return (
+            f"<AccessContext superuser={self.is_superuser} "
+            f"roles={sorted(self.roles)} employee={self.employee_id}>"
+        )
+
+
+def get_access(request) -> AccessContext:
+    """Return the request's AccessContext, building it if the middleware did not run."""
+    access = getattr(request, "access", None)
+    if access is None:
+        access = AccessContext.for_user(getattr(request, "user", None))
+        request.access = access
+    return access
@@ -0,0 +1,19 @@
+from django.utils.functional import SimpleLazyObject
+
+from .access import AccessContext
+
+
+class AccessContextMiddleware:
+    """
+    Attach a lazily built AccessContext to every request as `request.access`.
+
+    Must come after AuthenticationMiddleware. Nothing is queried until a view
+    or admin hook actually reads it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.access = SimpleLazyObject(lambda: AccessContext.for_user(request.user))
+        return self.get_response(request)
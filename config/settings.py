@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,11 +48,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'platform_core.instrumentation.RequestMetricsMiddleware',
+    'platform_core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.AccessContextMiddleware',
+    'platform_core.middleware.ModuleGateMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -58,7 +65,8 @@ ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to RequestMetricsMiddleware
+        'BACKEND': 'platform_core.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -85,6 +93,19 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Local memory by default; point UI_DETAIL_CACHE_ALIAS at a shared backend
+# (Redis, Memcached) in production so invalidations reach every worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'hr-portal',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -130,3 +151,102 @@ LOGOUT_REDIRECT_URL = "/accounts/login/"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    # EmployeeDocument.file: deduplicated, sharded by organization and hash
+    "documents": {"BACKEND": "hr_core.storage.ContentAddressedStorage"},
+}
+# media is never served directly; documents go through ui:document_download
+DOCUMENT_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# None (stream from Django), "X-Accel-Redirect" (nginx) or "X-Sendfile" (Apache/lighttpd)
+DOCUMENT_SENDFILE_HEADER = None
+# internal nginx location aliased to MEDIA_ROOT, used with X-Accel-Redirect
+DOCUMENT_SENDFILE_PREFIX = "/protected-media/"
+
+# UI
+UI_EMPLOYEE_PAGE_SIZE = 50
+UI_MAX_PAGE_SIZE = 500
+UI_EXPORT_CHUNK_SIZE = 2000
+UI_ORG_CHART_DEPTH = 2
+UI_ORG_CHART_MAX_NODES = 500
+UI_DETAIL_CACHE_ALIAS = "default"
+UI_DETAIL_CACHE_TIMEOUT = 300
+UI_TYPEAHEAD_LIMIT = 10
+UI_TYPEAHEAD_MAX_LIMIT = 50
+UI_DOCUMENT_SEARCH_PAGE_SIZE = 20
+UI_HEADCOUNT_TREND_DAYS = 30
+
+# Org modules
+ORG_MODULE_GATING = True
+# URL prefixes gated by an OrgModule code; ui views use @module_required
+ORG_MODULE_ROUTES = {
+    "/admin/hr_core/": "HR",
+}
+ORG_REGISTRY_TTL = 60
+ORG_REGISTRY_MAX_ENTRIES = 1024
+
+# Request instrumentation
+REQUEST_METRICS_WINDOW = 1000
+# max SQL queries per resolved view name (fnmatch patterns, first match wins)
+QUERY_BUDGETS = {
+    "ui:*": 15,
+    "admin:hr_core_*": 25,
+}
+# raise instead of logging a warning on a breach (enable in test runs)
+QUERY_BUDGET_STRICT = False
+
+# Admin
+# changelists stop counting after this many rows (None: exact COUNT(*))
+ADMIN_COUNT_CAP = 10000
+
+# Database profiles, selected with HR_PORTAL_DB_PROFILE
+SQLITE_PRAGMAS = {
+    # readers no longer block the writer and vice versa
+    "journal_mode": "WAL",
+    # fsync at checkpoints only; still safe against application crashes in WAL mode
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    # negative = KiB
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+DATABASE_PROFILES = {
+    "default": {},
+    "tuned": {
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": ";".join(f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()),
+            # take the write lock at BEGIN: a deferred transaction that has to
+            # upgrade from read to write fails with "database is locked"
+            # instead of waiting for the busy timeout
+            "transaction_mode": "IMMEDIATE",
+            # busy timeout, seconds
+            "timeout": 20,
+        },
+    },
+}
+DATABASE_PROFILE = os.environ.get("HR_PORTAL_DB_PROFILE", "default")
+if DATABASE_PROFILE not in DATABASE_PROFILES:
+    raise ImproperlyConfigured(
+        f"HR_PORTAL_DB_PROFILE={DATABASE_PROFILE!r}; expected one of {', '.join(DATABASE_PROFILES)}"
+    )
+DATABASES["default"].update(DATABASE_PROFILES[DATABASE_PROFILE])
+
+# Read replica: set HR_PORTAL_REPLICA_DB to a second SQLite file (kept in
+# sync with the sync_replica command) to serve ui reads from it
+if os.environ.get("HR_PORTAL_REPLICA_DB"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ["HR_PORTAL_REPLICA_DB"],
+        # tests run against default only
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["platform_core.routers.ReplicaRouter"]
+REPLICA_DATABASE = "replica"
+# url namespaces whose safe requests read from the replica
+REPLICA_ROUTED_NAMESPACES = ("ui",)
+# after a write, the user reads from default for this long (read-your-writes)
+REPLICA_STICKY_SECONDS = 10
+REPLICA_PIN_COOKIE = "db_pin"
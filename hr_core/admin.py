@@ -1,88 +1,95 @@
 from django.contrib import admin
+from django.db.models import Q
 
-from .models import Department, Position, Employee, EmployeeDocument
+from accounts.access import get_access
+from platform_core.paginator import CappedCountPaginator
+
+from .models import Department, DocumentToken, Position, Employee, EmployeeDocument
+from .search import normalize, prefix_bounds
+
+
+class OrgScopedRelatedFilter(admin.RelatedFieldListFilter):
+    """Related-object filter listing only the requesting user's organization."""
+
+    def field_choices(self, field, request, model_admin):
+        access = get_access(request)
+        if access.is_superuser:
+            return super().field_choices(field, request, model_admin)
+        return field.get_choices(
+            include_blank=False,
+            ordering=self.field_admin_ordering(field, request, model_admin),
+            limit_choices_to={"organization_id": access.organization_id},
+        )
 
 
 @admin.register(Department)
 class DepartmentAdmin(admin.ModelAdmin):
     list_display = ("id", "organization", "name", "parent")
+    list_select_related = ("organization", "parent")
     list_filter = ("organization",)
     search_fields = ("name",)
+    ordering = ("name", "id")
 
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
-
-        if request.user.is_superuser:
-            return qs
-
-        employee = getattr(request.user, "employee_profile", None)
-        if employee is None:
-            return qs.none()
-
-        return qs.filter(organization=employee.organization)
+        return super().get_queryset(request).for_access(get_access(request))
 
 
 
 @admin.register(Position)
 class PositionAdmin(admin.ModelAdmin):
     list_display = ("id", "organization", "name")
+    list_select_related = ("organization",)
     list_filter = ("organization",)
     search_fields = ("name",)
+    ordering = ("name", "id")
 
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
-
-        if request.user.is_superuser:
-            return qs
-
-        employee = getattr(request.user, "employee_profile", None)
-        if employee is None:
-            return qs.none()
-
-        return qs.filter(organization=employee.organization)
+        return super().get_queryset(request).for_access(get_access(request))
 
 @admin.register(EmployeeDocument)
 class EmployeeDocumentAdmin(admin.ModelAdmin):
     list_display = ("id", "organization", "employee", "doc_type", "title", "issued_date", "created_at")
+    list_select_related = ("organization", "employee")
     list_filter = ("organization", "doc_type")
-    search_fields = ("title", "identifier", "employee__first_name", "employee__last_name")
+    # shows the search box; the lookup itself is get_search_results()
+    search_fields = ("title", "identifier", "notes")
+    # the employee options come from EmployeeAdmin.get_queryset, i.e. scoped by access
+    autocomplete_fields = ("employee",)
+    paginator = CappedCountPaginator
+    show_full_result_count = False
 
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
-
-        if request.user.is_superuser:
-            return qs
-
-        employee = getattr(request.user, "employee_profile", None)
-        if employee is None:
-            return qs.none()
-
-        # EMPLOYEE sees only own documents (even in documents section)
-        if request.user.groups.filter(name="EMPLOYEE").exists():
-            return qs.filter(employee=employee)
-
-        # ORG_ADMIN / HR_MANAGER: only org documents
-        return qs.filter(organization=employee.organization)
+        # EMPLOYEE sees only own documents, ORG_ADMIN / HR_MANAGER the org's
+        return super().get_queryset(request).for_access(get_access(request))
+
+    def get_search_results(self, request, queryset, search_term):
+        # the token index covers title, identifier, doc type and notes
+        if not search_term.strip():
+            return queryset, False
+        hits = DocumentToken.objects.for_access(get_access(request)).search(search_term)
+        # ...and employee names through the typeahead keys
+        lo, hi = prefix_bounds(normalize(search_term))
+        return queryset.filter(
+            Q(pk__in=hits.values("document_id").order_by())
+            | Q(employee__search_key__gte=lo, employee__search_key__lt=hi)
+            | Q(employee__search_key_rev__gte=lo, employee__search_key_rev__lt=hi)
+        ), False
 
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
-        if request.user.is_superuser:
+        access = get_access(request)
+
+        if access.is_superuser:
             return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
-        employee = getattr(request.user, "employee_profile", None)
-        if employee is None:
+        if access.employee is None:
             if db_field.name == "employee":
                 kwargs["queryset"] = db_field.remote_field.model.objects.none()
             return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
         if db_field.name == "employee":
-            # documents can be linked only to employees from same organization
-            kwargs["queryset"] = db_field.remote_field.model.objects.filter(
-                organization=employee.organization
-            )
-
-            # EMPLOYEE can link documents only to self (if you ever allow add)
-            if request.user.groups.filter(name="EMPLOYEE").exists():
-                kwargs["queryset"] = kwargs["queryset"].filter(pk=employee.pk)
+            # documents can be linked only to employees from same organization,
+            # and EMPLOYEE only to self (if you ever allow add)
+            kwargs["queryset"] = db_field.remote_field.model.objects.for_access(access)
 
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
@@ -91,6 +98,17 @@ class EmployeeDocumentInline(admin.TabularInline):
     model = EmployeeDocument
     extra = 0
 
+    def get_queryset(self, request):
+        # read-only rows (view permission only) render the organization per row
+        return super().get_queryset(request).select_related("organization")
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == "organization" and formfield is not None:
+            # evaluate the choices once for the formset instead of once per row
+            formfield.choices = list(formfield.choices)
+        return formfield
+
 @admin.register(Employee)
 class EmployeeAdmin(admin.ModelAdmin):
     list_display = (
@@ -105,38 +123,36 @@ class EmployeeAdmin(admin.ModelAdmin):
         "position",
         "manager",
     )
-    list_filter = ("organization", "employment_status", "employment_type", "department", "position")
+    list_select_related = ("organization", "user", "department", "position", "manager")
+    list_filter = (
+        "organization",
+        "employment_status",
+        "employment_type",
+        ("department", OrgScopedRelatedFilter),
+        ("position", OrgScopedRelatedFilter),
+    )
     search_fields = ("first_name", "last_name")
+    ordering = ("last_name", "first_name", "id")
+    # served by the related admins' get_queryset, so the options stay scoped by access
+    autocomplete_fields = ("department", "position", "manager")
+    paginator = CappedCountPaginator
+    show_full_result_count = False
     inlines = [EmployeeDocumentInline]
 
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
-
-        # 1) Superuser sees everything
-        if request.user.is_superuser:
-            return qs
-
-        # 2) If user has no linked employee, show nothing
-        employee = getattr(request.user, "employee_profile", None)
-        if employee is None:
-            return qs.none()
-
-        # 3) EMPLOYEE role: only self
-        if request.user.groups.filter(name="EMPLOYEE").exists():
-            return qs.filter(pk=employee.pk)
-
-        # 4) ORG_ADMIN / HR_MANAGER: only same organization
-        return qs.filter(organization=employee.organization)
+        # superuser: everything, no profile: nothing, EMPLOYEE: only self,
+        # ORG_ADMIN / HR_MANAGER: only same organization
+        return super().get_queryset(request).for_access(get_access(request))
     
     
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
-        employee = getattr(request.user, "employee_profile", None)
+        access = get_access(request)
 
         # superuser or no linked employee -> keep default behavior (or empty)
-        if request.user.is_superuser:
+        if access.is_superuser:
             return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
-        if employee is None:
+        if access.employee is None:
             # no org context => prevent selecting anything
             if db_field.name in {"department", "position", "manager"}:
                 kwargs["queryset"] = db_field.remote_field.model.objects.none()
@@ -144,18 +160,18 @@ class EmployeeAdmin(admin.ModelAdmin):
 
         if db_field.name == "department":
             kwargs["queryset"] = db_field.remote_field.model.objects.filter(
-                organization=employee.organization
+                organization_id=access.organization_id
             )
 
         if db_field.name == "position":
             kwargs["queryset"] = db_field.remote_field.model.objects.filter(
-                organization=employee.organization
+                organization_id=access.organization_id
             )
 
         if db_field.name == "manager":
             # manager must be an employee from the same organization
             kwargs["queryset"] = db_field.remote_field.model.objects.filter(
-                organization=employee.organization
+                organization_id=access.organization_id
             )
 
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
@@ -164,19 +180,20 @@ class EmployeeAdmin(admin.ModelAdmin):
         if obj is None:
             return super().has_view_permission(request, obj=obj)
 
-        if request.user.is_superuser:
+        access = get_access(request)
+
+        if access.is_superuser:
             return True
 
-        employee = getattr(request.user, "employee_profile", None)
-        if employee is None:
+        if access.employee is None:
             return False
 
         # EMPLOYEE: only self
-        if request.user.groups.filter(name="EMPLOYEE").exists():
-            return obj.pk == employee.pk
+        if access.is_employee_role:
+            return obj.pk == access.employee_id
 
         # ORG_ADMIN / HR_MANAGER: only same org
-        return obj.organization_id == employee.organization_id
+        return obj.organization_id == access.organization_id
 
     def has_change_permission(self, request, obj=None):
         # let Django handle module-level permission first
@@ -186,18 +203,19 @@ class EmployeeAdmin(admin.ModelAdmin):
         if obj is None:
             return True
 
-        if request.user.is_superuser:
+        access = get_access(request)
+
+        if access.is_superuser:
             return True
 
-        employee = getattr(request.user, "employee_profile", None)
-        if employee is None:
+        if access.employee is None:
             return False
 
         # EMPLOYEE: no editing other employees; usually no editing at all
-        if request.user.groups.filter(name="EMPLOYEE").exists():
-            return obj.pk == employee.pk and request.user.has_perm("hr_core.change_employee")
+        if access.is_employee_role:
+            return obj.pk == access.employee_id and request.user.has_perm("hr_core.change_employee")
 
-        return obj.organization_id == employee.organization_id
+        return obj.organization_id == access.organization_id
 
     def has_delete_permission(self, request, obj=None):
         if not super().has_delete_permission(request, obj=obj):
@@ -206,16 +224,17 @@ class EmployeeAdmin(admin.ModelAdmin):
         if obj is None:
             return True
 
-        if request.user.is_superuser:
+        access = get_access(request)
+
+        if access.is_superuser:
             return True
 
-        employee = getattr(request.user, "employee_profile", None)
-        if employee is None:
+        if access.employee is None:
             return False
 
         # EMPLOYEE: never delete
-        if request.user.groups.filter(name="EMPLOYEE").exists():
+        if access.is_employee_role:
             return False
 
-        return obj.organization_id == employee.organization_id
+        return obj.organization_id == access.organization_id
 
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class HrCoreConfig(AppConfig):
     name = 'hr_core'
+
+    def ready(self):
+        from . import signals  # noqa
@@ -0,0 +1,490 @@
+import logging
+from collections import defaultdict
+
+from django.db import models
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from accounts.access import AccessContext
+
+from .search import document_tokens, normalize, prefix_bounds, tokenize
+
+
+logger = logging.getLogger(__name__)
+
+# terms beyond this are ignored in document search
+MAX_QUERY_TERMS = 8
+
+
+def cycle_breaks(managers: dict) -> list:
+    """
+    Ids whose manager link closes a loop in `managers` (employee id ->
+    manager id); dropping those links leaves a forest. Managers missing
+    from the mapping are treated as roots.
+    """
+    done = set()
+    broken = []
+    for start in managers:
+        path = []
+        on_path = set()
+        node = start
+        while node is not None and node in managers and node not in done and node not in on_path:
+            path.append(node)
+            on_path.add(node)
+            node = managers[node]
+        if node in on_path:
+            broken.append(path[-1])
+        done.update(path)
+    return broken
+
+
+def subtree_bounds(path: str):
+    """
+    Half-open range [lo, hi) of materialized paths that start with `path`.
+
+    Paths look like "/1/5/9/"; "/" sorts right below "0", so every descendant
+    of "/1/5/" falls in ["/1/5/", "/1/50"). A range scan can use a plain
+    b-tree index on any backend, unlike LIKE 'x%'.
+    """
+    return path, path[:-1] + "0"
+
+
+class TenantQuerySet(models.QuerySet):
+    """
+    Queryset of organization-owned rows with the portal's visibility rules:
+
+    - superuser sees everything
+    - a user without an employee profile sees nothing
+    - EMPLOYEE sees only rows about themselves (when the model has such a field)
+    - ORG_ADMIN / HR_MANAGER see their organization
+    """
+
+    # lookup pointing at the row's employee; None means EMPLOYEE sees the whole org
+    self_field = None
+
+    def for_access(self, access: AccessContext):
+        if access.is_superuser:
+            return self
+
+        if access.employee is None:
+            return self.none()
+
+        if self.self_field is not None and access.is_employee_role:
+            return self.filter(**{self.self_field: access.employee_id})
+
+        return self.filter(organization_id=access.organization_id)
+
+    def for_user(self, user):
+        return self.for_access(AccessContext.for_user(user))
+
+
+class DepartmentQuerySet(TenantQuerySet):
+    def with_related(self):
+        return self.select_related("organization", "parent")
+
+    def subtree(self, department, include_self=True):
+        lo, hi = subtree_bounds(department.path)
+        qs = self.filter(organization_id=department.organization_id, path__gte=lo, path__lt=hi)
+        if not include_self:
+            qs = qs.exclude(pk=department.pk)
+        return qs
+
+
+class PositionQuerySet(TenantQuerySet):
+    def with_related(self):
+        return self.select_related("organization")
+
+
+class EmployeeQuerySet(TenantQuerySet):
+    self_field = "pk"
+
+    def with_related(self):
+        return self.select_related("organization", "department", "position", "manager", "user")
+
+    def directory(self):
+        """Columns the employee directory renders, joined in one query."""
+        return self.select_related(
+            "organization", "department", "position", "manager"
+        ).only(
+            "id",
+            "first_name",
+            "last_name",
+            "employment_status",
+            "employment_type",
+            "organization",
+            "department",
+            "position",
+            "manager",
+            "organization__name",
+            "department__name",
+            "position__name",
+            "manager__first_name",
+            "manager__last_name",
+        )
+
+    def refresh_search_keys(self, batch_size=1000) -> int:
+        """Recompute typeahead keys for every row (after raw SQL or bulk_update writes)."""
+        updated = 0
+        batch = []
+        for employee in self.only("id", "first_name", "last_name").iterator(chunk_size=batch_size):
+            employee.set_search_keys()
+            batch.append(employee)
+            if len(batch) >= batch_size:
+                updated += self.bulk_update(batch, ["search_key", "search_key_rev"])
+                batch = []
+        if batch:
+            updated += self.bulk_update(batch, ["search_key", "search_key_rev"])
+        return updated
+
+    def probation_ending(self, start, end):
+        """Employees on probation whose probation ends in [start, end]."""
+        return self.filter(
+            employment_status=self.model.EmploymentStatus.PROBATION,
+            probation_end_date__gte=start,
+            probation_end_date__lte=end,
+        )
+
+    def complete_probation(self, ended_before) -> list:
+        """
+        Move employees whose probation ended before `ended_before` to ACTIVE
+        in one UPDATE and return their ids.
+
+        update() sends no post_save: callers announce the ids with
+        hr_core.signals.employees_updated so cached pages are dropped.
+        """
+        status = self.model.EmploymentStatus
+        ids = list(
+            self.filter(
+                employment_status=status.PROBATION,
+                probation_end_date__lt=ended_before,
+            ).values_list("pk", flat=True)
+        )
+        if ids:
+            # updated_at is set by hand (auto_now only runs on save()); ETags
+            # and headcount change detection depend on it
+            self.filter(pk__in=ids, employment_status=status.PROBATION).update(
+                employment_status=status.ACTIVE,
+                updated_at=timezone.now(),
+            )
+        return ids
+
+    def typeahead(self, term: str, limit: int = 10):
+        """
+        Up to `limit` employees whose "first last" or "last first" key starts
+        with `term`, ordered by the matched key. The term is one prefix of the
+        whole key: "garc" and "garcia jo" match José García, "garc jo" does not
+        (only the last word typed may be partial).
+
+        Each key is an index range scan limited to `limit` rows; the two
+        result sets are merged here, so the cost does not grow with the org.
+        """
+        prefix = normalize(term)
+        if not prefix:
+            return []
+        lo, hi = prefix_bounds(prefix)
+
+        matches = {}
+        for field in ("search_key", "search_key_rev"):
+            rows = self.filter(**{f"{field}__gte": lo, f"{field}__lt": hi}).order_by(field, "id")[:limit]
+            for employee in rows:
+                key = (getattr(employee, field), employee.pk)
+                if employee.pk not in matches or key < matches[employee.pk][0]:
+                    matches[employee.pk] = (key, employee)
+        return [employee for _, employee in sorted(matches.values(), key=lambda m: m[0])][:limit]
+
+    def reports_of(self, employee, direct_only=False):
+        """Everyone below `employee` in the reporting tree, in one join."""
+        if direct_only:
+            return self.filter(ancestor_links__ancestor=employee, ancestor_links__depth=1)
+        return self.filter(ancestor_links__ancestor=employee, ancestor_links__depth__gt=0)
+
+    def management_chain(self, employee):
+        """Managers above `employee`, nearest first, up to the top of the tree."""
+        return self.filter(
+            descendant_links__descendant=employee,
+            descendant_links__depth__gt=0,
+        ).order_by("descendant_links__depth")
+
+    def with_span_of_control(self):
+        return self.annotate(
+            direct_reports=models.Count(
+                "descendant_links", filter=models.Q(descendant_links__depth=1)
+            ),
+            total_reports=models.Count(
+                "descendant_links", filter=models.Q(descendant_links__depth__gt=0)
+            ),
+        )
+
+    def in_department(self, department, include_subtree=True):
+        if not include_subtree:
+            return self.filter(department=department)
+        lo, hi = subtree_bounds(department.path)
+        return self.filter(
+            organization_id=department.organization_id,
+            department__path__gte=lo,
+            department__path__lt=hi,
+        )
+
+
+class EmployeeDocumentQuerySet(TenantQuerySet):
+    self_field = "employee_id"
+
+    def with_related(self):
+        return self.select_related("organization", "employee")
+
+    def blob_references(self, names) -> dict:
+        """{file name: number of documents using it}; content-addressed blobs are shared."""
+        return dict(
+            self.filter(file__in=list(names))
+            .values_list("file")
+            .annotate(references=Count("id"))
+            .order_by()
+        )
+
+
+class DocumentTokenQuerySet(TenantQuerySet):
+    self_field = "employee_id"
+
+    def index(self, documents, batch_size=1000) -> int:
+        """(Re)write the tokens of `documents`; returns the number of rows written."""
+        written = 0
+        chunk = []
+        for document in documents:
+            chunk.append(document)
+            if len(chunk) >= batch_size:
+                written += self._index_chunk(chunk, batch_size)
+                chunk = []
+        if chunk:
+            written += self._index_chunk(chunk, batch_size)
+        return written
+
+    def _index_chunk(self, documents, batch_size):
+        self.filter(document_id__in=[d.pk for d in documents]).delete()
+        rows = [
+            self.model(
+                organization_id=document.organization_id,
+                employee_id=document.employee_id,
+                document_id=document.pk,
+                token=token,
+                weight=weight,
+            )
+            for document in documents
+            for token, weight in document_tokens(document).items()
+        ]
+        self.bulk_create(rows, batch_size=batch_size)
+        return len(rows)
+
+    def search(self, query: str):
+        """
+        Rows of {document_id, score} for documents matching every term of
+        `query` (each term as a token prefix), best score first.
+
+        Call on an already scoped queryset (for_access) so that the scoping
+        is part of the index lookup.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+        if not terms:
+            return self.none().values("document_id")
+
+        any_term = Q()
+        per_term = {}
+        for i, term in enumerate(terms):
+            lo, hi = prefix_bounds(term)
+            matches = Q(token__gte=lo, token__lt=hi)
+            any_term |= matches
+            per_term[f"term_{i}"] = Count("id", filter=matches)
+
+        return (
+            self.filter(any_term)
+            .values("document_id")
+            .annotate(score=Sum("weight"), **per_term)
+            .filter(**{f"{name}__gt": 0 for name in per_term})
+            .values("document_id", "score")
+            .order_by("-score", "document_id")
+        )
+
+
+class HeadcountSnapshotQuerySet(TenantQuerySet):
+    def latest_date(self, on_or_before=None):
+        qs = self if on_or_before is None else self.filter(date__lte=on_or_before)
+        return qs.aggregate(latest=models.Max("date"))["latest"]
+
+    def totals(self, start, end):
+        """[(date, headcount)] for every snapshot date in [start, end]."""
+        return list(
+            self.filter(date__gte=start, date__lte=end)
+            .values_list("date")
+            .annotate(total=Sum("headcount"))
+            .order_by("date")
+        )
+
+    def breakdown(self, day, dimension):
+        """[(value, label, headcount)] on `day` grouped by one of the model's DIMENSIONS."""
+        if dimension not in self.model.DIMENSIONS:
+            raise ValueError(f"Unknown dimension {dimension!r}")
+        # names as they were on `day`
+        label = f"{dimension}_name" if dimension in ("department", "position") else dimension
+        return list(
+            self.filter(date=day)
+            .values_list(dimension, label)
+            .annotate(total=Sum("headcount"))
+            .order_by("-total", label)
+        )
+
+
+class ReportingLineQuerySet(models.QuerySet):
+    """
+    Maintenance of the Employee.manager closure table.
+
+    Every employee has a (self, self, 0) row, and one (ancestor, descendant, depth)
+    row per manager above them, so transitive lookups are a single join.
+    """
+
+    def creates_cycle(self, employee_id, manager_id) -> bool:
+        if manager_id is None or employee_id is None:
+            return False
+        if manager_id == employee_id:
+            return True
+        # manager is somewhere below the employee
+        return self.filter(ancestor_id=employee_id, descendant_id=manager_id).exists()
+
+    def insert_node(self, employee_id, manager_id=None):
+        rows = [self.model(ancestor_id=employee_id, descendant_id=employee_id, depth=0)]
+        if manager_id is not None:
+            rows += [
+                self.model(ancestor_id=ancestor_id, descendant_id=employee_id, depth=depth + 1)
+                for ancestor_id, depth in self.filter(descendant_id=manager_id).values_list(
+                    "ancestor_id", "depth"
+                )
+            ]
+        self.bulk_create(rows, ignore_conflicts=True)
+        if manager_id is not None:
+            self._count_reports([row.ancestor_id for row in rows[1:]], manager_id, 1)
+
+    def _count_reports(self, ancestor_ids, manager_id, size):
+        """Add a subtree of `size` people (negative: remove it) below `manager_id`."""
+        step = 1 if size > 0 else -1
+        self.filter(ancestor_id__in=ancestor_ids, depth=0).update(
+            total_reports=F("total_reports") + size,
+            direct_reports=Case(
+                When(ancestor_id=manager_id, then=F("direct_reports") + step),
+                default=F("direct_reports"),
+            ),
+        )
+
+    def refresh_report_counts(self, ancestor_ids=None):
+        """Recount the stored report counts (all employees, or `ancestor_ids`) from the table."""
+        reports = (
+            self.model.objects.filter(ancestor_id=OuterRef("ancestor_id"), depth__gt=0)
+            .values("ancestor_id")
+            .order_by()
+        )
+        rows = self.filter(depth=0)
+        if ancestor_ids is not None:
+            rows = rows.filter(ancestor_id__in=ancestor_ids)
+        return rows.update(
+            direct_reports=Coalesce(
+                Subquery(reports.filter(depth=1).annotate(n=Count("id")).values("n")), 0
+            ),
+            total_reports=Coalesce(Subquery(reports.annotate(n=Count("id")).values("n")), 0),
+        )
+
+    def move_subtree(self, employee_id, manager_id=None):
+        """Re-attach employee_id and everything below it under manager_id (or make it a root)."""
+        subtree = list(self.filter(ancestor_id=employee_id).values_list("descendant_id", "depth"))
+        old_ancestors = dict(
+            self.filter(descendant_id=employee_id, depth__gt=0).values_list("ancestor_id", "depth")
+        )
+        subtree_ids = [descendant_id for descendant_id, _ in subtree]
+
+        if old_ancestors:
+            self.filter(ancestor_id__in=old_ancestors, descendant_id__in=subtree_ids).delete()
+            old_manager_id = next(pk for pk, depth in old_ancestors.items() if depth == 1)
+            self._count_reports(list(old_ancestors), old_manager_id, -len(subtree))
+
+        if manager_id is None:
+            return
+
+        new_ancestors = list(self.filter(descendant_id=manager_id).values_list("ancestor_id", "depth"))
+        self._count_reports([ancestor_id for ancestor_id, _ in new_ancestors], manager_id, len(subtree))
+        self.bulk_create(
+            [
+                self.model(
+                    ancestor_id=ancestor_id,
+                    descendant_id=descendant_id,
+                    depth=ancestor_depth + descendant_depth + 1,
+                )
+                for ancestor_id, ancestor_depth in new_ancestors
+                for descendant_id, descendant_depth in subtree
+            ],
+            batch_size=1000,
+        )
+
+    def rebuild(self, employees, batch_size=1000) -> int:
+        """
+        Recompute the rows for `employees` (an Employee queryset, e.g. one org
+        or just the rows an import created) from their manager_id values.
+        Managers outside the queryset keep their rows and are linked to; the
+        report counts of the set and of every manager above it are recounted.
+
+        Cycles found in the data are broken where they are detected: the
+        employee whose manager closes the loop loses the manager, both in the
+        table and in Employee.manager, so the two never disagree.
+        """
+        managers = dict(employees.values_list("id", "manager_id"))
+        broken = cycle_breaks(managers)
+        if broken:
+            logger.warning("Reporting cycles broken by clearing the manager of employees %s", broken)
+            employees.model.objects.filter(pk__in=broken).update(manager=None)
+            for pk in broken:
+                managers[pk] = None
+
+        ids = list(managers)
+        # managers outside the set whose report counts change with it
+        recount = set()
+        for i in range(0, len(ids), batch_size):
+            rows = self.filter(descendant_id__in=ids[i : i + batch_size])
+            recount.update(rows.filter(depth__gt=0).values_list("ancestor_id", flat=True).distinct())
+            rows.delete()
+
+        # ancestors of managers outside the set, nearest first
+        outside = {m for m in managers.values() if m is not None and m not in managers}
+        external = defaultdict(list)
+        above = self.filter(descendant_id__in=outside).order_by("descendant_id", "depth")
+        for descendant_id, ancestor_id in above.values_list("descendant_id", "ancestor_id"):
+            external[descendant_id].append(ancestor_id)
+
+        def chain(pk):
+            # ancestors of pk, nearest first
+            path = []
+            current = managers.get(pk)
+            while current is not None and current in managers:
+                path.append(current)
+                current = managers[current]
+            if current is not None:
+                path += external.get(current, [current])
+            return path
+
+        created = 0
+        rows = []
+        for pk in managers:
+            rows.append(self.model(ancestor_id=pk, descendant_id=pk, depth=0))
+            rows.extend(
+                self.model(ancestor_id=ancestor_id, descendant_id=pk, depth=depth)
+                for depth, ancestor_id in enumerate(chain(pk), start=1)
+            )
+            if len(rows) >= batch_size:
+                self.bulk_create(rows, batch_size=batch_size)
+                created += len(rows)
+                rows = []
+        if rows:
+            self.bulk_create(rows, batch_size=batch_size)
+            created += len(rows)
+
+        for chain_above in external.values():
+            recount.update(chain_above)
+        recount = ids + [pk for pk in recount if pk not in managers]
+        for i in range(0, len(recount), batch_size):
+            self.refresh_report_counts(recount[i : i + batch_size])
+        return created
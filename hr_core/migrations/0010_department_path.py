@@ -0,0 +1,53 @@
+# Generated by Django 6.0 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+def backfill_paths(apps, schema_editor):
+    Department = apps.get_model("hr_core", "Department")
+    parents = dict(Department.objects.values_list("id", "parent_id"))
+    paths = {}
+
+    def path_of(pk, seen=()):
+        if pk in paths:
+            return paths[pk]
+        parent_id = parents.get(pk)
+        if parent_id is None or parent_id in seen:
+            # root, or a pre-existing cycle: break it here
+            path = f"/{pk}/"
+        else:
+            path = f"{path_of(parent_id, seen + (pk,))}{pk}/"
+        paths[pk] = path
+        return path
+
+    departments = list(Department.objects.only("id"))
+    for department in departments:
+        department.path = path_of(department.id)
+        department.depth = department.path.count("/") - 2
+    Department.objects.bulk_update(departments, ["path", "depth"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_core', '0009_employee_org_name_idx'),
+        ('platform_core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='department',
+            index=models.Index(fields=['organization', 'path'], name='department_org_path_idx'),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 6.0 on 2026-10-18 18:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_reporting_lines(apps, schema_editor):
+    Employee = apps.get_model("hr_core", "Employee")
+    ReportingLine = apps.get_model("hr_core", "ReportingLine")
+    managers = dict(Employee.objects.values_list("id", "manager_id"))
+
+    rows = []
+    for pk in managers:
+        rows.append(ReportingLine(ancestor_id=pk, descendant_id=pk, depth=0))
+        seen = {pk}
+        current, depth = managers.get(pk), 1
+        while current is not None and current not in seen:
+            rows.append(ReportingLine(ancestor_id=current, descendant_id=pk, depth=depth))
+            seen.add(current)
+            current, depth = managers.get(current), depth + 1
+    ReportingLine.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_core', '0010_department_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportingLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='hr_core.employee')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='hr_core.employee')),
+            ],
+            options={
+                'verbose_name': 'Reporting line',
+                'verbose_name_plural': 'Reporting lines',
+                'indexes': [models.Index(fields=['ancestor', 'depth'], name='reporting_ancestor_depth_idx'), models.Index(fields=['descendant', 'depth'], name='reporting_descendant_depth_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='uniq_reporting_line')],
+            },
+        ),
+        migrations.RunPython(backfill_reporting_lines, migrations.RunPython.noop),
+    ]
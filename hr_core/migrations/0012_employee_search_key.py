@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-18 18:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+from hr_core.search import employee_search_keys
+
+
+def backfill_search_keys(apps, schema_editor):
+    Employee = apps.get_model("hr_core", "Employee")
+    batch = []
+    for employee in Employee.objects.only("id", "first_name", "last_name").iterator(chunk_size=2000):
+        employee.search_key, employee.search_key_rev = employee_search_keys(
+            employee.first_name, employee.last_name
+        )
+        batch.append(employee)
+        if len(batch) >= 2000:
+            Employee.objects.bulk_update(batch, ["search_key", "search_key_rev"])
+            batch = []
+    Employee.objects.bulk_update(batch, ["search_key", "search_key_rev"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_core', '0011_reportingline'),
+        ('platform_core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='search_key',
+            field=models.CharField(default='', editable=False, max_length=201),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='search_key_rev',
+            field=models.CharField(default='', editable=False, max_length=201),
+        ),
+        migrations.RunPython(backfill_search_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['organization', 'search_key'], name='employee_org_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['organization', 'search_key_rev'], name='employee_org_search_rev_idx'),
+        ),
+    ]
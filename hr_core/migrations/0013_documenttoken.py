@@ -0,0 +1,56 @@
+# Generated by Django 6.0 on 2026-10-18 18:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from hr_core.search import document_tokens
+
+
+def backfill_tokens(apps, schema_editor):
+    EmployeeDocument = apps.get_model("hr_core", "EmployeeDocument")
+    DocumentToken = apps.get_model("hr_core", "DocumentToken")
+    rows = []
+    for document in EmployeeDocument.objects.iterator(chunk_size=2000):
+        for token, weight in document_tokens(document).items():
+            rows.append(
+                DocumentToken(
+                    organization_id=document.organization_id,
+                    employee_id=document.employee_id,
+                    document_id=document.pk,
+                    token=token,
+                    weight=weight,
+                )
+            )
+        if len(rows) >= 2000:
+            DocumentToken.objects.bulk_create(rows)
+            rows = []
+    DocumentToken.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_core', '0012_employee_search_key'),
+        ('platform_core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='hr_core.employeedocument')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='hr_core.employee')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='platform_core.organization')),
+            ],
+            options={
+                'verbose_name': 'Document token',
+                'verbose_name_plural': 'Document tokens',
+                'indexes': [models.Index(fields=['organization', 'token', 'document', 'weight'], name='document_token_org_idx'), models.Index(fields=['employee', 'token', 'document', 'weight'], name='document_token_employee_idx')],
+                'constraints': [models.UniqueConstraint(fields=('document', 'token'), name='uniq_document_token')],
+            },
+        ),
+        migrations.RunPython(backfill_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 18:19
+
+import os
+
+import hr_core.storage
+from django.db import migrations, models
+
+
+def backfill_file_names(apps, schema_editor):
+    # files stored before content addressing keep their original names
+    EmployeeDocument = apps.get_model("hr_core", "EmployeeDocument")
+    documents = list(EmployeeDocument.objects.exclude(file="").exclude(file__isnull=True).only("id", "file"))
+    for document in documents:
+        document.file_name = os.path.basename(document.file.name)
+    EmployeeDocument.objects.bulk_update(documents, ["file_name"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_core', '0013_documenttoken'),
+        ('platform_core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeedocument',
+            name='file_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='employeedocument',
+            name='file',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=hr_core.storage.document_storage, upload_to=hr_core.storage.document_upload_to),
+        ),
+        migrations.AddIndex(
+            model_name='employeedocument',
+            index=models.Index(fields=['file'], name='employee_document_file_idx'),
+        ),
+        migrations.RunPython(backfill_file_names, migrations.RunPython.noop),
+    ]
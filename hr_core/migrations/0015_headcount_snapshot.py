@@ -0,0 +1,63 @@
+# Generated by Django 6.0 on 2026-10-18 18:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_core', '0014_document_storage'),
+        ('platform_core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HeadcountSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('employment_status', models.CharField(choices=[('ACTIVE', 'Active'), ('PROBATION', 'Probation'), ('TERMINATED', 'Terminated')], max_length=20)),
+                ('employment_type', models.CharField(choices=[('STAFF', 'Staff'), ('CONTRACTOR', 'Contractor')], max_length=20)),
+                ('headcount', models.PositiveIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Headcount snapshot',
+                'verbose_name_plural': 'Headcount snapshots',
+            },
+        ),
+        migrations.CreateModel(
+            name='HeadcountWatermark',
+            fields=[
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='platform_core.organization')),
+                ('date', models.DateField()),
+                ('changes_through', models.DateTimeField()),
+                ('employees', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['organization', 'updated_at'], name='employee_org_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='headcountsnapshot',
+            name='department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='hr_core.department'),
+        ),
+        migrations.AddField(
+            model_name='headcountsnapshot',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='platform_core.organization'),
+        ),
+        migrations.AddField(
+            model_name='headcountsnapshot',
+            name='position',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='hr_core.position'),
+        ),
+        migrations.AddIndex(
+            model_name='headcountsnapshot',
+            index=models.Index(fields=['organization', 'date'], name='headcount_org_date_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 18:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_core', '0015_headcount_snapshot'),
+        ('platform_core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['organization', 'employment_status', 'probation_end_date'], name='employee_org_probation_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-18 19:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    EmployeeDocument = apps.get_model("hr_core", "EmployeeDocument")
+    EmployeeDocument.objects.update(updated_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_core', '0016_employee_probation_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeedocument',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
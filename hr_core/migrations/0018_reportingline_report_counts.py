@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-18 18:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_report_counts(apps, schema_editor):
+    ReportingLine = apps.get_model("hr_core", "ReportingLine")
+    reports = (
+        ReportingLine.objects.filter(ancestor_id=OuterRef("ancestor_id"), depth__gt=0)
+        .values("ancestor_id")
+        .order_by()
+    )
+    ReportingLine.objects.filter(depth=0).update(
+        direct_reports=Coalesce(Subquery(reports.filter(depth=1).annotate(n=Count("id")).values("n")), 0),
+        total_reports=Coalesce(Subquery(reports.annotate(n=Count("id")).values("n")), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_core', '0017_employeedocument_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportingline',
+            name='direct_reports',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='reportingline',
+            name='total_reports',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_report_counts, migrations.RunPython.noop),
+    ]
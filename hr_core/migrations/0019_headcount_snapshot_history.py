@@ -0,0 +1,54 @@
+# Generated by Django 6.0 on 2026-10-18 18:43
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_names(apps, schema_editor):
+    HeadcountSnapshot = apps.get_model("hr_core", "HeadcountSnapshot")
+    Department = apps.get_model("hr_core", "Department")
+    Position = apps.get_model("hr_core", "Position")
+    HeadcountSnapshot.objects.filter(department__isnull=False).update(
+        department_name=Subquery(Department.objects.filter(pk=OuterRef("department_id")).values("name")[:1])
+    )
+    HeadcountSnapshot.objects.filter(position__isnull=False).update(
+        position_name=Subquery(Position.objects.filter(pk=OuterRef("position_id")).values("name")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_core', '0018_reportingline_report_counts'),
+        ('platform_core', '0002_enable_hr_modules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='headcountsnapshot',
+            name='department_name',
+            field=models.CharField(blank=True, default='', max_length=150),
+        ),
+        migrations.AddField(
+            model_name='headcountsnapshot',
+            name='position_name',
+            field=models.CharField(blank=True, default='', max_length=150),
+        ),
+        migrations.RunPython(backfill_names, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='headcountsnapshot',
+            name='department',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hr_core.department'),
+        ),
+        migrations.AlterField(
+            model_name='headcountsnapshot',
+            name='position',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hr_core.position'),
+        ),
+        migrations.AddConstraint(
+            model_name='headcountsnapshot',
+            constraint=models.UniqueConstraint(models.F('organization'), models.F('date'), django.db.models.functions.comparison.Coalesce('department', models.Value(0)), django.db.models.functions.comparison.Coalesce('position', models.Value(0)), models.F('employment_status'), models.F('employment_type'), name='uniq_headcount_snapshot_group'),
+        ),
+    ]
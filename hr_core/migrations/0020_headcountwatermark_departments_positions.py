@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hr_core", "0019_headcount_snapshot_history"),
+    ]
+
+    # 0 never matches an organization's real counts once it has departments or
+    # positions, so the first run after this migration aggregates again
+    operations = [
+        migrations.AddField(
+            model_name="headcountwatermark",
+            name="departments",
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="headcountwatermark",
+            name="positions",
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+    ]
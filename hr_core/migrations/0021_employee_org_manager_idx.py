@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 18:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_core', '0020_headcountwatermark_departments_positions'),
+        ('platform_core', '0003_organization_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['organization', 'manager'], name='employee_org_manager_idx'),
+        ),
+    ]
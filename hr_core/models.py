@@ -1,9 +1,27 @@
-from django.db import models
+import os
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Concat, Substr
 
 from platform_core.models import Organization
 
 from django.conf import settings
 
+from .managers import (
+    DepartmentQuerySet,
+    DocumentTokenQuerySet,
+    EmployeeDocumentQuerySet,
+    EmployeeQuerySet,
+    HeadcountSnapshotQuerySet,
+    PositionQuerySet,
+    ReportingLineQuerySet,
+    subtree_bounds,
+)
+from .search import employee_search_keys
+from .storage import document_storage, document_upload_to
+
 
 class Department(models.Model):
     organization = models.ForeignKey(
@@ -22,9 +40,16 @@ class Department(models.Model):
         related_name="children",
     )
 
+    # materialized path of ids from the root, e.g. "/1/5/9/"; maintained by save()
+    # and by the post_delete handler in signals.py
+    path = models.CharField(max_length=255, default="", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DepartmentQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Department"
         verbose_name_plural = "Departments"
@@ -34,10 +59,70 @@ class Department(models.Model):
                 name="uniq_department_name_per_org",
             )
         ]
+        indexes = [
+            models.Index(fields=["organization", "path"], name="department_org_path_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
+    @property
+    def ancestor_ids(self) -> list[int]:
+        """Ids from the root down to (and including) this department."""
+        return [int(part) for part in self.path.strip("/").split("/") if part]
+
+    def breadcrumb(self):
+        return list(Department.objects.filter(pk__in=self.ancestor_ids).order_by("depth"))
+
+    def _parent_path(self) -> str:
+        if self.parent_id is None:
+            return "/"
+        return Department.objects.filter(pk=self.parent_id).values_list("path", flat=True).get()
+
+    def _current_path(self) -> str:
+        # re-read: an ancestor may have moved since this instance was loaded
+        if self.pk is None:
+            return ""
+        return Department.objects.filter(pk=self.pk).values_list("path", flat=True).first() or ""
+
+    def clean(self):
+        super().clean()
+        current = self._current_path()
+        if current and self.parent_id is not None and self._parent_path().startswith(current):
+            raise ValidationError(
+                {"parent": "A department cannot be moved under itself or one of its sub-departments."}
+            )
+
+    def save(self, *args, **kwargs):
+        parent_path = self._parent_path()
+        old_path = self._current_path()
+        if old_path and parent_path.startswith(old_path):
+            raise ValidationError(
+                "A department cannot be moved under itself or one of its sub-departments."
+            )
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            new_path = f"{parent_path}{self.pk}/"
+            if new_path == old_path:
+                self.path = new_path
+                return
+
+            new_depth = new_path.count("/") - 2
+            Department.objects.filter(pk=self.pk).update(path=new_path, depth=new_depth)
+
+            if old_path:
+                # re-parenting: rewrite the prefix of the whole subtree in one statement
+                lo, hi = subtree_bounds(old_path)
+                Department.objects.filter(path__gte=lo, path__lt=hi).exclude(pk=self.pk).update(
+                    path=Concat(Value(new_path), Substr("path", len(old_path) + 1)),
+                    depth=F("depth") + (new_depth - (old_path.count("/") - 2)),
+                )
+
+        self.path = new_path
+        self.depth = new_depth
+
 class Position(models.Model):
     organization = models.ForeignKey(
         Organization,
@@ -50,6 +135,8 @@ class Position(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PositionQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Position"
         verbose_name_plural = "Positions"
@@ -106,11 +193,16 @@ class EmployeeDocument(models.Model):
     )
 
     file = models.FileField(
-        upload_to="employee_documents/",
+        upload_to=document_upload_to,
+        storage=document_storage,
+        max_length=255,
         null=True,
         blank=True,
     )
 
+    # name of the uploaded file (set by document_upload_to); the stored name is its content hash
+    file_name = models.CharField(max_length=255, blank=True, default="", editable=False)
+
     url = models.URLField(
         null=True,
         blank=True,
@@ -122,6 +214,9 @@ class EmployeeDocument(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EmployeeDocumentQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Employee document"
@@ -132,10 +227,18 @@ class EmployeeDocument(models.Model):
                 name="employee_document_file_or_url",
             )
         ]
+        indexes = [
+            # blob reference lookups (garbage collection)
+            models.Index(fields=["file"], name="employee_document_file_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.get_doc_type_display()} — {self.title}"
 
+    @property
+    def download_name(self) -> str:
+        return self.file_name or os.path.basename(self.file.name)
+
 class Employee(models.Model):
     class EmploymentStatus(models.TextChoices):
         ACTIVE = "ACTIVE", "Active"
@@ -163,6 +266,10 @@ class Employee(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
 
+    # normalized "first last" / "last first" for typeahead, see search.py
+    search_key = models.CharField(max_length=201, default="", editable=False)
+    search_key_rev = models.CharField(max_length=201, default="", editable=False)
+
     employment_status = models.CharField(
         max_length=20,
         choices=EmploymentStatus.choices,
@@ -221,9 +328,278 @@ class Employee(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EmployeeQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Employee"
         verbose_name_plural = "Employees"
+        indexes = [
+            # keyset pagination of the directory: org filter + (last, first, id) seek
+            models.Index(
+                fields=["organization", "last_name", "first_name", "id"],
+                name="employee_org_name_idx",
+            ),
+            models.Index(fields=["organization", "search_key"], name="employee_org_search_idx"),
+            models.Index(fields=["organization", "search_key_rev"], name="employee_org_search_rev_idx"),
+            # probation scanner: status + date range within an organization
+            models.Index(
+                fields=["organization", "employment_status", "probation_end_date"],
+                name="employee_org_probation_idx",
+            ),
+            # change detection for headcount materialization
+            models.Index(fields=["organization", "updated_at"], name="employee_org_updated_idx"),
+            # org chart roots: manager IS NULL within an organization
+            models.Index(fields=["organization", "manager"], name="employee_org_manager_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.last_name} {self.first_name}"
+
+    def clean(self):
+        super().clean()
+        if ReportingLine.objects.creates_cycle(self.pk, self.manager_id):
+            raise ValidationError(
+                {"manager": "An employee cannot report to themselves or to someone who reports to them."}
+            )
+
+    def set_search_keys(self):
+        """Refresh the typeahead keys; bulk_create/bulk_update callers must call this."""
+        self.search_key, self.search_key_rev = employee_search_keys(self.first_name, self.last_name)
+
+    def save(self, *args, **kwargs):
+        self.set_search_keys()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"first_name", "last_name"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "search_key", "search_key_rev"}
+
+        adding = self._state.adding
+        old_manager_id = None
+        if not adding:
+            old_manager_id = (
+                Employee.objects.filter(pk=self.pk).values_list("manager_id", flat=True).first()
+            )
+            if self.manager_id != old_manager_id and ReportingLine.objects.creates_cycle(
+                self.pk, self.manager_id
+            ):
+                raise ValidationError(
+                    "An employee cannot report to themselves or to someone who reports to them."
+                )
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if adding:
+                ReportingLine.objects.insert_node(self.pk, self.manager_id)
+            elif self.manager_id != old_manager_id:
+                ReportingLine.objects.move_subtree(self.pk, self.manager_id)
+
+    def span_of_control(self) -> dict:
+        counts = (
+            ReportingLine.objects.filter(ancestor=self, depth=0)
+            .values_list("direct_reports", "total_reports")
+            .first()
+        )
+        direct, total = counts or (0, 0)
+        return {"direct": direct, "total": total}
+
+
+class ReportingLine(models.Model):
+    """
+    Closure table over Employee.manager: one row for every (manager above,
+    employee) pair plus a depth-0 row per employee. Maintained by
+    Employee.save() and the pre_delete handler in signals.py; rebuild with
+    the rebuild_reporting_lines command after bulk writes.
+
+    The depth-0 row also carries the employee's report counts, kept current
+    by the same code paths, so the org chart reads them instead of counting
+    whole subtrees.
+    """
+
+    ancestor = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="descendant_links",
+    )
+
+    descendant = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="ancestor_links",
+    )
+
+    depth = models.PositiveIntegerField()
+
+    # depth-0 rows only: people reporting directly / at any depth to the employee
+    direct_reports = models.IntegerField(default=0)
+    total_reports = models.IntegerField(default=0)
+
+    objects = ReportingLineQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Reporting line"
+        verbose_name_plural = "Reporting lines"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"],
+                name="uniq_reporting_line",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["ancestor", "depth"], name="reporting_ancestor_depth_idx"),
+            models.Index(fields=["descendant", "depth"], name="reporting_descendant_depth_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.ancestor_id} → {self.descendant_id} ({self.depth})"
+
+
+class DocumentToken(models.Model):
+    """
+    Inverted index over EmployeeDocument title, identifier, doc type and
+    notes: one row per (document, token) with the token's weight in that
+    document. organization and employee are copied from the document so the
+    tenant and EMPLOYEE scoping are applied inside the index query.
+    Maintained by the post_save handler in signals.py; rebuild with the
+    rebuild_document_index command after bulk writes.
+    """
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+
+    document = models.ForeignKey(
+        EmployeeDocument,
+        on_delete=models.CASCADE,
+        related_name="tokens",
+    )
+
+    token = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField()
+
+    objects = DocumentTokenQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Document token"
+        verbose_name_plural = "Document tokens"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["document", "token"],
+                name="uniq_document_token",
+            )
+        ]
+        indexes = [
+            # covering: a term lookup never touches the table
+            models.Index(
+                fields=["organization", "token", "document", "weight"],
+                name="document_token_org_idx",
+            ),
+            models.Index(
+                fields=["employee", "token", "document", "weight"],
+                name="document_token_employee_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.token} → {self.document_id} ({self.weight})"
+
+
+class HeadcountSnapshot(models.Model):
+    """
+    Daily headcount per organization × department × position × employment
+    status × employment type, as of the materialize_headcount run on `date`.
+    Dashboards read these rows only, never Employee.
+    """
+
+    # what a dashboard can group by
+    DIMENSIONS = ("department", "position", "employment_status", "employment_type")
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+
+    date = models.DateField()
+
+    # history is never rewritten: the ids (and the names as of `date`) stay
+    # when the department or position is later renamed or deleted
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    department_name = models.CharField(max_length=150, blank=True, default="")
+
+    position = models.ForeignKey(
+        Position,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    position_name = models.CharField(max_length=150, blank=True, default="")
+
+    employment_status = models.CharField(max_length=20, choices=Employee.EmploymentStatus.choices)
+    employment_type = models.CharField(max_length=20, choices=Employee.EmploymentType.choices)
+    headcount = models.PositiveIntegerField()
+
+    objects = HeadcountSnapshotQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Headcount snapshot"
+        verbose_name_plural = "Headcount snapshots"
+        constraints = [
+            # one row per group and day; NULL department/position count as a
+            # value of their own, which a plain multi-column UNIQUE would not
+            models.UniqueConstraint(
+                F("organization"),
+                F("date"),
+                Coalesce("department", Value(0)),
+                Coalesce("position", Value(0)),
+                F("employment_status"),
+                F("employment_type"),
+                name="uniq_headcount_snapshot_group",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["organization", "date"], name="headcount_org_date_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.organization_id} {self.date}: {self.headcount}"
+
+
+class HeadcountWatermark(models.Model):
+    """How far materialize_headcount has got for an organization."""
+
+    organization = models.OneToOneField(
+        Organization,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="+",
+    )
+
+    # last date with snapshot rows
+    date = models.DateField()
+    # Employee, Department and Position updated_at values up to here are
+    # reflected in the snapshots
+    changes_through = models.DateTimeField()
+    # row counts at that point; deletions do not show in updated_at
+    employees = models.PositiveIntegerField()
+    departments = models.PositiveIntegerField()
+    positions = models.PositiveIntegerField()
+
+    def __str__(self) -> str:
+        return f"{self.organization_id}: {self.date}"
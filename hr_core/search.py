@@ -0,0 +1,69 @@
+"""
+Normalized search keys for prefix (typeahead) lookups, and the tokenizer
+behind the EmployeeDocument inverted index (DocumentToken).
+
+Names are case-folded, stripped of accents and whitespace-collapsed, so
+"  José  GARCÍA" and "jose garcia" produce the same key. Employee stores
+"first last" and "last first" keys next to an (organization, key) index;
+a prefix is then an index range scan, see prefix_bounds().
+"""
+import re
+import unicodedata
+
+
+# sorts after every character a normalized key can contain
+PREFIX_SENTINEL = "\U0010ffff"
+
+MAX_TOKEN_LENGTH = 64
+
+# weight a token contributes to a document's score, per field it occurs in
+DOCUMENT_FIELD_WEIGHTS = {
+    "title": 4,
+    "identifier": 4,
+    "doc_type": 2,
+    "notes": 1,
+}
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def employee_search_keys(first_name: str, last_name: str):
+    """(search_key, search_key_rev) for an employee name."""
+    first, last = normalize(first_name), normalize(last_name)
+    return f"{first} {last}".strip(), f"{last} {first}".strip()
+
+
+def prefix_bounds(prefix: str):
+    """
+    Half-open range [lo, hi) of keys that start with `prefix`.
+
+    Like subtree_bounds(), a range instead of LIKE 'x%' so that a plain
+    b-tree index is used on every backend.
+    """
+    return prefix, prefix + PREFIX_SENTINEL
+
+
+def tokenize(text: str):
+    return [token[:MAX_TOKEN_LENGTH] for token in _WORD.findall(normalize(text))]
+
+
+def document_tokens(document) -> dict:
+    """{token: weight} for an EmployeeDocument's searchable metadata."""
+    fields = {
+        "title": document.title,
+        "identifier": document.identifier,
+        # both the code and its label, e.g. "ID" and "ID / Passport"
+        "doc_type": f"{document.doc_type} {document.get_doc_type_display()}",
+        "notes": document.notes,
+    }
+    weights = {}
+    for field, text in fields.items():
+        for token in set(tokenize(text)):
+            weights[token] = weights.get(token, 0) + DOCUMENT_FIELD_WEIGHTS[field]
+    return weights
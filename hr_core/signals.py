@@ -0,0 +1,51 @@
+from django.db.models import Value
+from django.db.models.functions import Concat, Length, Replace, StrIndex, Substr
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from .models import Department, DocumentToken, Employee, EmployeeDocument, ReportingLine
+
+
+# Sent after a set-based update() of employees (no post_save fires), with
+# `employee_ids`: the rows that changed.
+employees_updated = Signal()
+
+
+@receiver(post_delete, sender=Department)
+def detach_department_subtree(sender, instance: Department, **kwargs):
+    # Children were SET_NULL by the delete, so every descendant loses the
+    # "/<pk>/" segment and everything above it. Matching on the segment rather
+    # than on instance.path keeps this correct when a parent and its children
+    # are deleted in the same batch.
+    marker = f"/{instance.pk}/"
+    ids = list(
+        Department.objects.filter(
+            organization_id=instance.organization_id,
+            path__contains=marker,
+        ).values_list("pk", flat=True)
+    )
+    if not ids:
+        return
+
+    descendants = Department.objects.filter(pk__in=ids)
+    descendants.update(
+        path=Concat(
+            Value("/"),
+            Substr("path", StrIndex("path", Value(marker)) + len(marker)),
+        )
+    )
+    # depth = number of segments - 1
+    descendants.update(depth=Length("path") - Length(Replace("path", Value("/"), Value(""))) - 2)
+
+
+@receiver(pre_delete, sender=Employee)
+def detach_reporting_subtree(sender, instance: Employee, **kwargs):
+    # subordinates become roots (manager is SET_NULL); the employee's own rows
+    # go away with the CASCADE
+    ReportingLine.objects.move_subtree(instance.pk, None)
+
+
+@receiver(post_save, sender=EmployeeDocument)
+def index_document(sender, instance: EmployeeDocument, **kwargs):
+    # tokens of deleted documents go with the CASCADE
+    DocumentToken.objects.index([instance])
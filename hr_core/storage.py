@@ -0,0 +1,105 @@
+"""
+Content-addressed storage for EmployeeDocument files.
+
+The upload is hashed (SHA-256) while it is copied to a temporary file next
+to the final location, then renamed to
+
+    documents/<organization id>/<h[0:2]>/<h[2:4]>/<sha256><ext>
+
+so identical files uploaded for many employees of one organization are
+stored once, and no directory grows past a few hundred entries. Blobs are
+never shared across organizations.
+
+There is no stored reference count: a blob's references are the
+EmployeeDocument rows whose `file` is its name (EmployeeDocumentQuerySet.
+blob_references()). Deleting a document leaves the blob in place;
+gc_document_blobs removes blobs that no row references any more and that
+were not written or re-uploaded within its grace period.
+"""
+import hashlib
+import os
+import tempfile
+import time
+
+from django.core.files.storage import FileSystemStorage, storages
+
+
+DOCUMENTS_ROOT = "documents"
+INCOMING_DIR = ".incoming"
+
+
+def document_storage():
+    # callable so that the field (and its migrations) do not pin a backend
+    return storages["documents"]
+
+
+def document_upload_to(instance, filename):
+    # the stored name is the content hash, so keep the uploaded name on the row
+    instance.file_name = os.path.basename(filename)
+    # the storage keeps the directory (organization shard) and extension only
+    return f"{DOCUMENTS_ROOT}/{instance.organization_id}/{filename}"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    chunk_size = 64 * 1024
+
+    def get_available_name(self, name, max_length=None):
+        # the final name is derived from the content in _save(); an existing
+        # blob with that name is the same content, not a collision
+        return name
+
+    def _save(self, name, content):
+        prefix, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+
+        incoming = os.path.join(self.location, INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=incoming, delete=False) as tmp:
+            try:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks(self.chunk_size):
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+
+        hexdigest = digest.hexdigest()
+        final = f"{prefix}/{hexdigest[:2]}/{hexdigest[2:4]}/{hexdigest}{extension}"
+        path = self.path(final)
+
+        if os.path.exists(path):
+            # dedup: the blob is already there; refresh its mtime so that the
+            # garbage collector's grace period covers the row being saved
+            os.unlink(tmp.name)
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp.name, self.file_permissions_mode)
+            os.replace(tmp.name, path)
+        return final
+
+    def iter_blobs(self, min_age: float = 0):
+        """Names of stored blobs not modified in the last `min_age` seconds."""
+        root = self.path(DOCUMENTS_ROOT)
+        cutoff = time.time() - min_age
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                if os.path.getmtime(path) <= cutoff:
+                    yield os.path.relpath(path, self.location).replace(os.sep, "/")
+
+    def iter_incoming(self, min_age: float = 0):
+        """Temporary files left behind by interrupted uploads."""
+        root = os.path.join(self.location, INCOMING_DIR)
+        if not os.path.isdir(root):
+            return
+        cutoff = time.time() - min_age
+        for entry in os.scandir(root):
+            if entry.is_file() and entry.stat().st_mtime <= cutoff:
+                yield entry.path
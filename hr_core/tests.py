@@ -1,3 +1,413 @@
-from django.test import TestCase
+import hashlib
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.access import AccessContext, ROLE_EMPLOYEE, ROLE_HR_MANAGER, ROLE_ORG_ADMIN
+from hr_core.models import Department, Employee, EmployeeDocument, ReportingLine
+from platform_core.models import Organization
+from platform_core.synthetic import generate_organization
+from testsupport.querycount import SUPERUSER, QueryCountScalingTestCase
+from ui import detail_cache
+
+
+class AdminQueryCountTests(QueryCountScalingTestCase):
+    def pages(self, subject, document):
+        return [
+            ("employee_changelist", reverse("admin:hr_core_employee_changelist")),
+            ("employee_change", reverse("admin:hr_core_employee_change", args=[subject.pk])),
+            ("department_changelist", reverse("admin:hr_core_department_changelist")),
+            ("department_change", reverse("admin:hr_core_department_change", args=[subject.department_id])),
+            ("position_changelist", reverse("admin:hr_core_position_changelist")),
+            ("document_changelist", reverse("admin:hr_core_employeedocument_changelist")),
+            ("document_changelist_search", reverse("admin:hr_core_employeedocument_changelist") + "?q=o"),
+            ("document_change", reverse("admin:hr_core_employeedocument_change", args=[document.pk])),
+        ]
+
+    def test_superuser(self):
+        self.assertQueryCountsStable(SUPERUSER)
+
+    def test_org_admin(self):
+        self.assertQueryCountsStable(ROLE_ORG_ADMIN)
+
+    def test_hr_manager(self):
+        self.assertQueryCountsStable(ROLE_HR_MANAGER)
+
+    def test_employee(self):
+        self.assertQueryCountsStable(ROLE_EMPLOYEE)
+
+
+class AdminScalingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Large", employees=120, seed=1)
+        cls.other, _ = generate_organization("Other", employees=20, seed=2)
+        cls.subject = Employee.objects.filter(organization=cls.organization, manager__isnull=False).first()
+
+    def setUp(self):
+        self.client.force_login(self.users[ROLE_ORG_ADMIN])
+
+    def test_change_form_does_not_list_every_employee(self):
+        response = self.client.get(reverse("admin:hr_core_employee_change", args=[self.subject.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'data-ajax--url="/admin/autocomplete/"')
+        self.assertLess(response.content.count(b"<option"), 50)
+
+    def test_autocomplete_is_scoped_to_the_organization(self):
+        response = self.client.get(
+            "/admin/autocomplete/",
+            {"app_label": "hr_core", "model_name": "employee", "field_name": "manager", "term": ""},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        ids = {int(row["id"]) for row in response.json()["results"]}
+        self.assertTrue(ids)
+        self.assertEqual(
+            set(Employee.objects.filter(pk__in=ids).values_list("organization_id", flat=True)),
+            {self.organization.pk},
+        )
+
+    @override_settings(ADMIN_COUNT_CAP=30)
+    def test_changelist_count_is_capped(self):
+        response = self.client.get(reverse("admin:hr_core_employee_changelist"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 30)
+
+
+class DocumentStorageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.media = tempfile.TemporaryDirectory()
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media.name))
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media.cleanup()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization, _ = generate_organization("Blobs", employees=3, documents_per_employee=0, with_users=False)
+        cls.other, _ = generate_organization("Other", employees=1, documents_per_employee=0, with_users=False)
+
+    def upload(self, employee, content, filename="contract.PDF"):
+        document = EmployeeDocument(
+            organization=employee.organization,
+            employee=employee,
+            doc_type=EmployeeDocument.DocumentType.CONTRACT,
+            title="Contract",
+        )
+        document.file.save(filename, ContentFile(content))
+        return document
+
+    def test_identical_uploads_share_one_blob_per_organization(self):
+        first, second = Employee.objects.filter(organization=self.organization)[:2]
+        outsider = Employee.objects.get(organization=self.other)
+        digest = hashlib.sha256(b"same terms").hexdigest()
+
+        a = self.upload(first, b"same terms")
+        b = self.upload(second, b"same terms", filename="copy.pdf")
+        c = self.upload(outsider, b"same terms")
+
+        self.assertEqual(a.file.name, f"documents/{self.organization.pk}/{digest[:2]}/{digest[2:4]}/{digest}.pdf")
+        self.assertEqual(a.file.name, b.file.name)
+        self.assertNotEqual(a.file.name, c.file.name)
+        self.assertEqual((a.download_name, b.download_name), ("contract.PDF", "copy.pdf"))
+        self.assertEqual(EmployeeDocument.objects.blob_references([a.file.name]), {a.file.name: 2})
+
+    def test_gc_removes_only_unreferenced_blobs(self):
+        first, second = Employee.objects.filter(organization=self.organization)[:2]
+        shared = self.upload(first, b"shared")
+        self.upload(second, b"shared")
+        orphan = self.upload(first, b"orphan")
+        orphan.delete()
+
+        call_command("gc_document_blobs", min_age=0, stdout=StringIO())
+
+        storage = shared.file.storage
+        self.assertTrue(storage.exists(shared.file.name))
+        self.assertFalse(storage.exists(orphan.file.name))
+
+        # a blob stays while any document still uses it
+        shared.delete()
+        call_command("gc_document_blobs", min_age=0, stdout=StringIO())
+        self.assertTrue(storage.exists(shared.file.name))
+
+
+class ProbationScanTests(TestCase):
+    day = date(2026, 5, 1)
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Probation", employees=5, documents_per_employee=0, seed=1)
+        cls.other, _ = generate_organization("Other", employees=5, documents_per_employee=0, seed=2)
+        # generated probations end relative to today; start from none
+        Employee.objects.filter(employment_status=Employee.EmploymentStatus.PROBATION).update(
+            employment_status=Employee.EmploymentStatus.ACTIVE,
+        )
+
+        def on_probation(organization, name, ends_in):
+            return Employee.objects.create(
+                organization=organization,
+                first_name=name,
+                last_name="Probation",
+                employment_status=Employee.EmploymentStatus.PROBATION,
+                probation_start_date=cls.day + timedelta(days=ends_in - 90),
+                probation_end_date=cls.day + timedelta(days=ends_in),
+            )
+
+        cls.expired = on_probation(cls.organization, "Expired", -1)
+        cls.ending = on_probation(cls.organization, "Ending", 0)
+        cls.later = on_probation(cls.organization, "Later", 30)
+        cls.elsewhere = on_probation(cls.other, "Elsewhere", -5)
+
+    def scan(self, **options):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("scan_probations", date=self.day, organization=self.organization.pk, stdout=out, **options)
+        return out.getvalue()
+
+    def status(self, employee):
+        employee.refresh_from_db()
+        return employee.employment_status
+
+    def test_digest_lists_the_window_without_changing_anything(self):
+        with self.assertLogs("platform_core.management.commands.scan_probations", "INFO") as logs:
+            out = self.scan(days=14)
+
+        self.assertIn(f"({self.ending.pk}, —)", out)
+        self.assertNotIn(f"({self.later.pk},", out)
+        self.assertIn("1 already ended, still on PROBATION", out)
+        self.assertIn("1 ending, 1 expired, 0 activated", logs.output[0])
+        self.assertEqual(self.status(self.expired), Employee.EmploymentStatus.PROBATION)
+
+    def test_activate_moves_expired_probations_in_one_update(self):
+        access = AccessContext(is_superuser=True)
+        detail_cache.set_fragment(self.expired.pk, access, "<cached>")
+        touched = self.expired.updated_at
+
+        with CaptureQueriesContext(connection) as captured:
+            self.scan(activate=True)
+
+        self.assertEqual(len([q for q in captured if q["sql"].startswith("UPDATE")]), 1)
+
+        self.assertEqual(self.status(self.expired), Employee.EmploymentStatus.ACTIVE)
+        self.assertGreater(self.expired.updated_at, touched)
+        self.assertIsNone(detail_cache.get_fragment(self.expired.pk, access))
+        self.assertEqual(self.status(self.ending), Employee.EmploymentStatus.PROBATION)
+        self.assertEqual(self.status(self.elsewhere), Employee.EmploymentStatus.PROBATION)
+
+
+class DepartmentPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name="Paths")
+
+    def department(self, name, parent=None):
+        return Department.objects.create(organization=self.organization, name=name, parent=parent)
+
+    def tree(self):
+        """{name: (path with names, depth)} read back from the table."""
+        rows = list(
+            Department.objects.filter(organization=self.organization).values_list("pk", "name", "path", "depth")
+        )
+        names = {pk: name for pk, name, _, _ in rows}
+        return {
+            name: ("/".join(names[int(part)] for part in path.strip("/").split("/")), depth)
+            for _, name, path, depth in rows
+        }
+
+    def test_paths_follow_moves(self):
+        hq = self.department("HQ")
+        sales = self.department("Sales", hq)
+        emea = self.department("EMEA", sales)
+        self.department("Berlin", emea)
+        ops = self.department("Ops", hq)
+
+        sales.parent = ops
+        sales.save()
+        self.assertEqual(
+            self.tree(),
+            {
+                "HQ": ("HQ", 0),
+                "Ops": ("HQ/Ops", 1),
+                "Sales": ("HQ/Ops/Sales", 2),
+                "EMEA": ("HQ/Ops/Sales/EMEA", 3),
+                "Berlin": ("HQ/Ops/Sales/EMEA/Berlin", 4),
+            },
+        )
+
+        emea.refresh_from_db()
+        emea.parent = None
+        emea.save()
+        self.assertEqual(self.tree()["Berlin"], ("EMEA/Berlin", 1))
+        sales.refresh_from_db()
+        self.assertEqual([d.name for d in sales.breadcrumb()], ["HQ", "Ops", "Sales"])
+
+    def test_cannot_move_under_own_subtree(self):
+        hq = self.department("HQ")
+        sales = self.department("Sales", hq)
+        emea = self.department("EMEA", sales)
+
+        for parent in (hq, emea):
+            with self.subTest(parent=parent.name):
+                hq.parent = parent
+                with self.assertRaises(ValidationError):
+                    hq.full_clean()
+                with self.assertRaises(ValidationError):
+                    hq.save()
+        self.assertEqual(self.tree()["EMEA"], ("HQ/Sales/EMEA", 2))
+
+    def test_deleting_a_department_re_roots_its_subtree(self):
+        hq = self.department("HQ")
+        sales = self.department("Sales", hq)
+        emea = self.department("EMEA", sales)
+        self.department("Berlin", emea)
+        self.department("Retail", sales)
+
+        sales.delete()
+        emea.refresh_from_db()
+
+        self.assertEqual(
+            self.tree(),
+            {
+                "HQ": ("HQ", 0),
+                "EMEA": ("EMEA", 0),
+                "Berlin": ("EMEA/Berlin", 1),
+                "Retail": ("Retail", 0),
+            },
+        )
+        self.assertEqual(
+            list(Department.objects.subtree(emea).order_by("depth").values_list("name", flat=True)),
+            ["EMEA", "Berlin"],
+        )
+
+
+class ReportingLineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name="Reporting")
+
+    def employee(self, name, manager=None):
+        return Employee.objects.create(organization=self.organization, first_name=name, last_name="Line", manager=manager)
+
+    def lines(self):
+        lines = ReportingLine.objects.filter(descendant__organization=self.organization)
+        rows = set(lines.values_list("ancestor__first_name", "descendant__first_name", "depth"))
+
+        # the stored report counts agree with the table
+        stored = {
+            name: (direct, total)
+            for name, direct, total in lines.filter(depth=0).values_list(
+                "ancestor__first_name", "direct_reports", "total_reports"
+            )
+        }
+        counted = {
+            name: (
+                sum(1 for a, _, d in rows if a == name and d == 1),
+                sum(1 for a, _, d in rows if a == name and d > 0),
+            )
+            for name, _, depth in rows
+            if depth == 0
+        }
+        self.assertEqual(stored, counted)
+        return rows
+
+    def closure(self, managers):
+        """The rows a consistent table holds for {name: manager name}."""
+        rows = set()
+        for name in managers:
+            current, depth = name, 0
+            while current is not None:
+                rows.add((current, name, depth))
+                current, depth = managers[current], depth + 1
+        return rows
+
+    def test_moving_a_subtree(self):
+        ceo = self.employee("Ceo")
+        cto = self.employee("Cto", ceo)
+        dev = self.employee("Dev", cto)
+        cfo = self.employee("Cfo", ceo)
+
+        cto.manager = cfo
+        cto.save()
+        self.assertEqual(self.lines(), self.closure({"Ceo": None, "Cfo": "Ceo", "Cto": "Cfo", "Dev": "Cto"}))
+
+        cto.manager = None
+        cto.save()
+        self.assertEqual(self.lines(), self.closure({"Ceo": None, "Cfo": "Ceo", "Cto": None, "Dev": "Cto"}))
+        self.assertEqual(list(Employee.objects.reports_of(cto).values_list("pk", flat=True)), [dev.pk])
+
+    def test_save_rejects_cycles(self):
+        ceo = self.employee("Ceo")
+        cto = self.employee("Cto", ceo)
+        dev = self.employee("Dev", cto)
+
+        for manager in (dev, ceo):
+            with self.subTest(manager=manager.first_name), self.assertRaises(ValidationError):
+                ceo.manager = manager
+                ceo.save()
+        ceo.refresh_from_db()
+        self.assertIsNone(ceo.manager_id)
+
+    def test_deleting_a_manager_detaches_the_subtree(self):
+        ceo = self.employee("Ceo")
+        cto = self.employee("Cto", ceo)
+        self.employee("Dev", cto)
+
+        cto.delete()
+
+        self.assertEqual(self.lines(), self.closure({"Ceo": None, "Dev": None}))
+
+    def test_rebuild_breaks_cycles(self):
+        a = self.employee("A")
+        b = self.employee("B", a)
+        c = self.employee("C", b)
+        Employee.objects.filter(pk=a.pk).update(manager=c)
+
+        with self.assertLogs("hr_core.managers", "WARNING"):
+            ReportingLine.objects.rebuild(Employee.objects.filter(organization=self.organization))
+
+        managers = dict(Employee.objects.filter(organization=self.organization).values_list("first_name", "manager__first_name"))
+        self.assertEqual(sum(m is None for m in managers.values()), 1)
+        self.assertEqual(self.lines(), self.closure(managers))
+
+    def import_rows(self, text):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as fh:
+            fh.write("first_name,last_name,ref,manager_ref\n" + text)
+            fh.flush()
+            out = StringIO()
+            call_command("import_employees", fh.name, organization=self.organization.pk, stdout=out)
+        return out.getvalue()
+
+    def test_import_skips_cycles_and_leaves_other_employees_alone(self):
+        ceo = self.employee("Ceo")
+        self.employee("Cto", ceo)
+        before = self.lines()
+        existing = set(ReportingLine.objects.values_list("pk", flat=True))
+
+        out = self.import_rows("A,Imp,a,b\nB,Imp,b,a\nC,Imp,c,a\nD,Imp,d,\n")
+
+        self.assertIn("would close a reporting cycle", out)
+        managers = dict(
+            Employee.objects.filter(organization=self.organization, last_name="Imp").values_list(
+                "first_name", "manager__first_name"
+            )
+        )
+        self.assertEqual(sum(m is None for m in managers.values()), 2)
+        self.assertEqual(self.lines(), before | self.closure(managers))
+        # existing rows are neither deleted nor rewritten
+        self.assertLessEqual(existing, set(ReportingLine.objects.values_list("pk", flat=True)))
@@ -0,0 +1,36 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+
+from accounts.access import get_access
+
+from .registry import org_registry
+
+
+def module_allowed(request, code: str) -> bool:
+    if not settings.ORG_MODULE_GATING:
+        return True
+
+    access = get_access(request)
+    if access.is_superuser or access.organization_id is None:
+        # superuser is not bound to an org; users without a profile see nothing anyway
+        return True
+
+    return org_registry.is_enabled(access.organization_id, code)
+
+
+def module_required(code: str):
+    """Deny the view (403) unless the user's organization has module `code` enabled."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not module_allowed(request, code):
+                raise PermissionDenied(f"Module {code} is not enabled for this organization")
+            return view(request, *args, **kwargs)
+
+        wrapper.required_module = code
+        return wrapper
+
+    return decorator
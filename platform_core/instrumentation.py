@@ -0,0 +1,194 @@
+"""
+Per-view request instrumentation.
+
+RequestMetricsMiddleware records query count, DB time, template render time,
+total time and response size for every request, keyed by the resolved view
+name (e.g. "ui:employee_list", "admin:hr_core_employee_changelist"). It adds
+them to the response as a Server-Timing header and keeps a rolling window of
+samples per view in-process (see metrics_snapshot()).
+
+Per-view query budgets come from QUERY_BUDGETS (fnmatch patterns -> max
+queries). A breach is logged, or raises QueryBudgetExceeded when
+QUERY_BUDGET_STRICT is on, which is meant for test runs.
+
+Template time is measured by InstrumentedDjangoTemplates, which must be the
+template BACKEND for it to be reported. Work done while a streaming response
+is consumed happens after the middleware returns and is not counted.
+"""
+import contextvars
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from fnmatch import fnmatchcase
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "template_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+
+_current_stats = contextvars.ContextVar("request_stats", default=None)
+
+
+def _count_query(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += time.perf_counter() - started
+
+
+class _TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current_stats.get()
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            if stats is not None:
+                stats.template_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend that reports top-level render time to the current request."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return _TimedTemplate(template.template, self)
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted sequence; None when it is empty."""
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class RollingHistogram:
+    """Last `window` samples per view; percentiles are computed on read."""
+
+    FIELDS = ("total_ms", "db_ms", "template_ms", "queries", "size")
+
+    def __init__(self, window=None):
+        self._window = window
+        self._samples = defaultdict(self._new_window)
+        self._lock = threading.Lock()
+
+    def _new_window(self):
+        window = self._window if self._window is not None else settings.REQUEST_METRICS_WINDOW
+        return deque(maxlen=window)
+
+    def add(self, view_name, sample: dict):
+        with self._lock:
+            self._samples[view_name].append(sample)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = {name: list(window) for name, window in self._samples.items()}
+
+        result = {}
+        for name, rows in samples.items():
+            summary = {"count": len(rows)}
+            for field in self.FIELDS:
+                values = sorted(row[field] for row in rows if row[field] is not None)
+                summary[field] = {
+                    "p50": percentile(values, 0.50),
+                    "p95": percentile(values, 0.95),
+                    "p99": percentile(values, 0.99),
+                    "max": values[-1] if values else None,
+                }
+            result[name] = summary
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+
+histogram = RollingHistogram()
+
+
+def metrics_snapshot() -> dict:
+    return histogram.snapshot()
+
+
+def query_budget(view_name):
+    for pattern, budget in settings.QUERY_BUDGETS.items():
+        if fnmatchcase(view_name, pattern):
+            return budget
+    return None
+
+
+class RequestMetricsMiddleware:
+    """Should be first in MIDDLEWARE so that every query of the request is counted."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_count_query))
+                response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        total = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match is not None else "<unresolved>"
+        size = None if response.streaming else len(response.content)
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+                f"tpl;dur={stats.template_time * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}",
+            ]
+        )
+        histogram.add(
+            view_name,
+            {
+                "total_ms": total * 1000,
+                "db_ms": stats.db_time * 1000,
+                "template_ms": stats.template_time * 1000,
+                "queries": stats.queries,
+                "size": size,
+            },
+        )
+
+        budget = query_budget(view_name)
+        if budget is not None and stats.queries > budget:
+            message = f"{view_name} ran {stats.queries} queries (budget {budget}) for {request.path}"
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
@@ -0,0 +1,48 @@
+"""
+Base for maintenance commands that work through organizations one at a time.
+
+OrganizationCommand adds --organization (default: all, in id order), runs
+handle_organization() for each organization in its own transaction, writes
+one timed line per organization and a summary at the end. Subclasses that
+need a different loop can still use organizations() for the lookup.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from platform_core.models import Organization
+
+
+class OrganizationCommand(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Only this organization id (default: all)")
+
+    def organizations(self, options):
+        organizations = Organization.objects.order_by("id")
+        if options["organization"] is not None:
+            organizations = organizations.filter(pk=options["organization"])
+            if not organizations.exists():
+                raise CommandError(f"Organization not found: {options['organization']}")
+        return organizations
+
+    def handle(self, *args, **options):
+        results = []
+        for organization in self.organizations(options):
+            started = time.perf_counter()
+            with transaction.atomic():
+                result = self.handle_organization(organization, options)
+            results.append(result)
+            self.stdout.write(f"{organization}: {self.describe(result)} in {time.perf_counter() - started:.2f}s")
+
+        self.stdout.write(self.style.SUCCESS(self.summarize(results, options)))
+
+    def handle_organization(self, organization, options):
+        """Do the work for one organization; the return value goes to describe() and summarize()."""
+        raise NotImplementedError("subclasses of OrganizationCommand must provide a handle_organization() method")
+
+    def describe(self, result):
+        return str(result)
+
+    def summarize(self, results, options):
+        return f"Done ({len(results)} organizations)."
@@ -0,0 +1,179 @@
+import copy
+import json
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.utils import timezone
+
+from hr_core.models import Employee
+from platform_core.instrumentation import percentile
+
+
+READ_PAGE_SIZE = 50
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a mixed read/write load from concurrent threads against a snapshot of the "
+        "SQLite database, once per DATABASE_PROFILES entry, and report throughput, "
+        "latency and 'database is locked' errors. Generate data first (generate_hr_data)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles",
+            default=",".join(settings.DATABASE_PROFILES),
+            help="Comma-separated DATABASE_PROFILES to compare (default: all)",
+        )
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per profile")
+        parser.add_argument("--write-ratio", type=float, default=0.2, help="Share of write requests (0-1)")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--output", help="Also write the results as JSON here")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("The default database is not SQLite")
+        profiles = [p.strip() for p in options["profiles"].split(",") if p.strip()]
+        unknown = set(profiles) - set(settings.DATABASE_PROFILES)
+        if unknown or not profiles:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown)) or '(none)'}")
+        if options["threads"] < 1 or options["duration"] <= 0 or not 0 <= options["write_ratio"] <= 1:
+            raise CommandError("--threads and --duration must be positive, --write-ratio within 0-1")
+
+        sample = list(Employee.objects.values_list("id", "organization_id")[:10000])
+        if not sample:
+            raise CommandError("No employees to work on; run generate_hr_data first")
+
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for profile in profiles:
+                alias = f"bench_{profile}"
+                path = Path(tmp) / f"{profile}.sqlite3"
+                self.snapshot(path)
+                self.add_alias(alias, path, profile)
+                try:
+                    self.stdout.write(f"{profile}: {options['threads']} threads for {options['duration']:.0f}s...")
+                    row = self.run_load(alias, sample, options)
+                finally:
+                    del connections.settings[alias]
+                row["profile"] = profile
+                results.append(row)
+                self.stdout.write(
+                    f"  {row['requests_per_s']:>8.1f} req/s  ({row['reads']} reads, {row['writes']} writes, "
+                    f"{row['locked']} locked)  read p50 {row['read_p50_ms']:.1f} / p99 {row['read_p99_ms']:.1f} ms  "
+                    f"write p50 {row['write_p50_ms']:.1f} / p99 {row['write_p99_ms']:.1f} ms"
+                )
+
+        baseline = results[0]
+        for row in results[1:]:
+            ratio = row["requests_per_s"] / baseline["requests_per_s"] if baseline["requests_per_s"] else float("inf")
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{row['profile']} vs {baseline['profile']}: throughput x{ratio:.2f}, "
+                    f"locked {baseline['locked']} -> {row['locked']}"
+                )
+            )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                json.dump({"options": {k: options[k] for k in ("threads", "duration", "write_ratio")}, "results": results}, fh, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+    def snapshot(self, path):
+        # online backup, then back to a rollback journal so that every
+        # profile starts from the same state (a WAL database stays WAL)
+        source = sqlite3.connect(settings.DATABASES["default"]["NAME"])
+        target = sqlite3.connect(path)
+        try:
+            source.backup(target)
+            target.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            source.close()
+            target.close()
+
+    def add_alias(self, alias, path, profile):
+        database = {
+            "ENGINE": settings.DATABASES["default"]["ENGINE"],
+            "NAME": str(path),
+            **copy.deepcopy(settings.DATABASE_PROFILES[profile]),
+        }
+        # configure_settings() fills in the defaults and insists on a "default" entry
+        configured = connections.configure_settings({"default": settings.DATABASES["default"], alias: database})
+        connections.settings[alias] = configured[alias]
+
+    def run_load(self, alias, sample, options):
+        deadline = time.perf_counter() + options["duration"]
+        outcomes = []
+        lock = threading.Lock()
+
+        def worker(n):
+            rng = random.Random(options["seed"] * 1000 + n)
+            reads, writes, locked = [], [], 0
+            db = connections[alias]
+            try:
+                while time.perf_counter() < deadline:
+                    employee_id, organization_id = rng.choice(sample)
+                    is_write = rng.random() < options["write_ratio"]
+                    started = time.perf_counter()
+                    try:
+                        if is_write:
+                            self.write_request(alias, employee_id)
+                        else:
+                            self.read_request(alias, employee_id, organization_id, rng)
+                    except OperationalError:
+                        locked += 1
+                        continue
+                    finally:
+                        # what request_finished does: honours CONN_MAX_AGE
+                        db.close_if_unusable_or_obsolete()
+                    (writes if is_write else reads).append((time.perf_counter() - started) * 1000)
+            finally:
+                db.close()
+                with lock:
+                    outcomes.append((reads, writes, locked))
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(options["threads"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        reads = sorted(t for r, _, _ in outcomes for t in r)
+        writes = sorted(t for _, w, _ in outcomes for t in w)
+        return {
+            "requests_per_s": round((len(reads) + len(writes)) / elapsed, 1),
+            "reads": len(reads),
+            "writes": len(writes),
+            "locked": sum(n for _, _, n in outcomes),
+            "read_p50_ms": round(percentile(reads, 0.50) or 0.0, 3),
+            "read_p99_ms": round(percentile(reads, 0.99) or 0.0, 3),
+            "read_mean_ms": round(statistics.fmean(reads), 3) if reads else 0.0,
+            "write_p50_ms": round(percentile(writes, 0.50) or 0.0, 3),
+            "write_p99_ms": round(percentile(writes, 0.99) or 0.0, 3),
+            "write_mean_ms": round(statistics.fmean(writes), 3) if writes else 0.0,
+        }
+
+    def read_request(self, alias, employee_id, organization_id, rng):
+        # a directory page and a detail lookup
+        employees = Employee.objects.using(alias).filter(organization_id=organization_id)
+        offset = rng.randrange(0, 500)
+        list(employees.directory().order_by("last_name", "first_name", "id")[offset : offset + READ_PAGE_SIZE])
+        Employee.objects.using(alias).with_related().get(pk=employee_id)
+
+    def write_request(self, alias, employee_id):
+        # read-modify-write in one transaction, like an admin save
+        with transaction.atomic(using=alias):
+            employees = Employee.objects.using(alias).filter(pk=employee_id)
+            employees.values_list("first_name", flat=True).get()
+            employees.update(updated_at=timezone.now())
@@ -0,0 +1,167 @@
+import io
+import json
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.access import ROLE_ORG_ADMIN
+from hr_core.models import Employee
+from platform_core.instrumentation import percentile
+from platform_core.synthetic import generate_organization
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the HR portal hot paths (ui pages and hr_core admin changelists) "
+        "against synthetic organizations of several sizes and write JSON results"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1000,10000,100000",
+            help="Comma-separated employee counts (default: 1000,10000,100000)",
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Timed requests per page")
+        parser.add_argument("--output", default="bench_results.json", help="Where to write JSON results")
+        parser.add_argument("--compare", help="Earlier results file to diff against")
+        parser.add_argument("--host", default="localhost", help="Host header for requests (must be allowed)")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Commit the generated organizations instead of rolling them back",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be a comma-separated list of integers")
+        if not sizes or min(sizes) < 3 or options["repeat"] < 1:
+            raise CommandError("sizes must be >= 3 and --repeat positive")
+
+        call_command("setup_roles", stdout=io.StringIO())
+
+        results = []
+        for size in sizes:
+            self.stdout.write(f"Size {size}: generating...")
+            with transaction.atomic():
+                started = time.perf_counter()
+                organization, users = generate_organization(
+                    f"Bench {size}",
+                    employees=size,
+                    seed=options["seed"],
+                )
+                self.stdout.write(f"  generated in {time.perf_counter() - started:.1f}s")
+
+                superuser = get_user_model()(username=f"bench-su-{organization.pk}", is_superuser=True, is_staff=True)
+                superuser.set_unusable_password()
+                superuser.save()
+
+                for role, user in (("superuser", superuser), (ROLE_ORG_ADMIN, users[ROLE_ORG_ADMIN])):
+                    results += self.bench_role(size, organization, role, user, options)
+
+                if not options["keep"]:
+                    transaction.set_rollback(True)
+
+        report = {
+            "commit": self.git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "repeat": options["repeat"],
+            "results": results,
+        }
+        with open(options["output"], "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {options['output']}"))
+
+        if options["compare"]:
+            self.compare(options["compare"], results)
+
+    def pages(self, organization):
+        # a mid-tree employee: has a manager and reports
+        employee = Employee.objects.filter(organization=organization).order_by("id")[1]
+        return [
+            ("ui:employee_list", reverse("ui:employee_list")),
+            ("ui:employee_detail", reverse("ui:employee_detail", args=[employee.pk])),
+            ("ui:department_list", reverse("ui:department_list")),
+            ("admin:hr_core_employee_changelist", reverse("admin:hr_core_employee_changelist")),
+            ("admin:hr_core_employeedocument_changelist", reverse("admin:hr_core_employeedocument_changelist")),
+        ]
+
+    def bench_role(self, size, organization, role, user, options):
+        client = Client(HTTP_HOST=options["host"])
+        client.force_login(user)
+
+        rows = []
+        for view_name, url in self.pages(organization):
+            response = client.get(url)  # warm-up (caches, template loading)
+            if response.status_code != 200:
+                raise CommandError(f"{view_name} returned {response.status_code} for {role}")
+
+            timings = []
+            queries = []
+            for _ in range(options["repeat"]):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+                queries.append(len(captured))
+
+            timings.sort()
+            row = {
+                "size": size,
+                "role": role,
+                "view": view_name,
+                "p50_ms": round(percentile(timings, 0.50), 3),
+                "p95_ms": round(percentile(timings, 0.95), 3),
+                "p99_ms": round(percentile(timings, 0.99), 3),
+                "mean_ms": round(statistics.fmean(timings), 3),
+                "queries": max(queries),
+            }
+            rows.append(row)
+            self.stdout.write(
+                f"  {role:<10} {view_name:<45} p50 {row['p50_ms']:>8.1f} ms  "
+                f"p95 {row['p95_ms']:>8.1f} ms  p99 {row['p99_ms']:>8.1f} ms  {row['queries']:>3} queries"
+            )
+        return rows
+
+    def compare(self, path, results):
+        with open(path, encoding="utf-8") as fh:
+            baseline = {
+                (r["size"], r["role"], r["view"]): r for r in json.load(fh)["results"]
+            }
+
+        self.stdout.write(f"Compared with {path}:")
+        for row in results:
+            before = baseline.get((row["size"], row["role"], row["view"]))
+            if before is None:
+                continue
+            ratio = row["p50_ms"] / before["p50_ms"] if before["p50_ms"] else float("inf")
+            line = (
+                f"  {row['size']:>7} {row['role']:<10} {row['view']:<45} "
+                f"p50 x{ratio:.2f}  queries {before['queries']} -> {row['queries']}"
+            )
+            if ratio > 1.2 or row["queries"] > before["queries"]:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
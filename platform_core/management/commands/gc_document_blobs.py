@@ -0,0 +1,71 @@
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hr_core.models import EmployeeDocument
+from hr_core.storage import document_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete content-addressed document blobs that no EmployeeDocument references "
+        "(left behind by deletions or replaced files), and stale partial uploads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=24 * 3600,
+            help="Only blobs not written or re-uploaded for this many seconds (default: 1 day)",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Report, delete nothing")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+        storage = document_storage()
+        if not hasattr(storage, "iter_blobs"):
+            raise CommandError(f"{type(storage).__name__} is not a content-addressed storage")
+
+        self.storage = storage
+        self.dry_run = options["dry_run"]
+        started = time.perf_counter()
+        scanned = removed = freed = 0
+
+        blobs = storage.iter_blobs(min_age=options["min_age"])
+        while batch := list(islice(blobs, options["batch_size"])):
+            counts = self.collect(batch)
+            scanned, removed, freed = scanned + len(batch), removed + counts[0], freed + counts[1]
+
+        incoming = 0
+        for path in storage.iter_incoming(min_age=options["min_age"]):
+            incoming += 1
+            if not self.dry_run:
+                os.unlink(path)
+
+        mode = " (dry run)" if self.dry_run else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Scanned {scanned} blobs, removed {removed} orphans ({freed / 1024 / 1024:.1f} MiB) "
+                f"and {incoming} stale partial uploads in {time.perf_counter() - started:.2f}s{mode}."
+            )
+        )
+
+    def collect(self, names):
+        referenced = EmployeeDocument.objects.blob_references(names)
+        removed = freed = 0
+        for name in names:
+            if name in referenced:
+                continue
+            size = self.storage.size(name)
+            if self.dry_run:
+                self.stdout.write(f"  would remove {name}")
+            else:
+                self.storage.delete(name)
+            removed += 1
+            freed += size
+        return removed, freed
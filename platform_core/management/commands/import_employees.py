@@ -0,0 +1,255 @@
+import csv
+import json
+import time
+from datetime import date
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from hr_core.managers import cycle_breaks
+from hr_core.models import Employee, Department, Position, ReportingLine
+from platform_core.models import Organization
+
+
+DATE_FIELDS = ("hire_date", "probation_start_date", "probation_end_date")
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import employees into an organization from a CSV or JSONL file. "
+        "Columns: first_name, last_name, employment_status, employment_type, "
+        "hire_date, probation_start_date, probation_end_date, department, "
+        "position, ref, manager_ref."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file")
+        parser.add_argument("--organization", type=int, required=True, help="Organization id")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="Input format (default: from the file extension)",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Parse and resolve everything, write nothing",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"File not found: {path}")
+
+        fmt = options["format"] or ("jsonl" if path.suffix in {".jsonl", ".ndjson"} else "csv")
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+        self.dry_run = options["dry_run"]
+
+        try:
+            self.organization = Organization.objects.get(pk=options["organization"])
+        except Organization.DoesNotExist:
+            raise CommandError(f"Organization not found: {options['organization']}")
+
+        # in-memory name -> id lookups for this org, filled lazily for new names
+        self.departments = dict(
+            Department.objects.filter(organization=self.organization).values_list("name", "id")
+        )
+        self.positions = dict(
+            Position.objects.filter(organization=self.organization).values_list("name", "id")
+        )
+        self.refs = {}
+        self.pending_managers = []
+        self.created_departments = 0
+        self.created_positions = 0
+
+        mode = " (dry run)" if self.dry_run else ""
+        self.stdout.write(f"Importing {path} into {self.organization}{mode}...")
+
+        started = time.perf_counter()
+        imported = skipped = 0
+        batch = []
+
+        with transaction.atomic():
+            for line_no, row in self.read_rows(path, fmt):
+                try:
+                    batch.append(self.build_employee(row))
+                except ValueError as exc:
+                    skipped += 1
+                    self.stdout.write(self.style.WARNING(f"Line {line_no}: skipped ({exc})"))
+                    continue
+
+                if len(batch) >= batch_size:
+                    imported += self.flush(batch, imported)
+                    batch = []
+
+            if batch:
+                imported += self.flush(batch, imported)
+
+            linked = self.link_managers(batch_size)
+
+            if not self.dry_run and imported:
+                # bulk_create/bulk_update bypass Employee.save(), which keeps the
+                # reporting-line closure table current. Imported rows only link
+                # to each other and have no rows yet; nothing else changed.
+                ReportingLine.objects.rebuild(
+                    Employee.objects.filter(organization=self.organization, ancestor_links__isnull=True),
+                    batch_size=batch_size,
+                )
+
+            if self.dry_run:
+                transaction.set_rollback(True)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} employees ({skipped} skipped, {linked} manager links, "
+                f"{self.created_departments} new departments, {self.created_positions} new positions) "
+                f"in {elapsed:.2f}s{mode}."
+            )
+        )
+
+    def read_rows(self, path, fmt):
+        with path.open(newline="", encoding="utf-8") as fh:
+            if fmt == "csv":
+                # header is line 1
+                for line_no, row in enumerate(csv.DictReader(fh), start=2):
+                    yield line_no, row
+                return
+
+            for line_no, line in enumerate(fh, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as exc:
+                    raise CommandError(f"Line {line_no}: invalid JSON ({exc})")
+
+    def build_employee(self, row) -> Employee:
+        # JSONL may carry numbers (e.g. refs); compare everything as text
+        row = {k: (str(v).strip() if v is not None else None) for k, v in row.items() if k}
+
+        first_name = row.get("first_name")
+        last_name = row.get("last_name")
+        if not first_name or not last_name:
+            raise ValueError("first_name and last_name are required")
+
+        status = row.get("employment_status") or Employee.EmploymentStatus.ACTIVE
+        if status not in Employee.EmploymentStatus.values:
+            raise ValueError(f"unknown employment_status {status!r}")
+
+        employment_type = row.get("employment_type") or Employee.EmploymentType.STAFF
+        if employment_type not in Employee.EmploymentType.values:
+            raise ValueError(f"unknown employment_type {employment_type!r}")
+
+        dates = {}
+        for field in DATE_FIELDS:
+            dates[field] = date.fromisoformat(row[field]) if row.get(field) else None
+
+        employee = Employee(
+            organization=self.organization,
+            first_name=first_name,
+            last_name=last_name,
+            employment_status=status,
+            employment_type=employment_type,
+            department_id=self.resolve_department(row.get("department")),
+            position_id=self.resolve_position(row.get("position")),
+            **dates,
+        )
+        # bulk_create skips save()
+        employee.set_search_keys()
+        # carried to flush(); not model fields
+        employee._import_ref = row.get("ref") or None
+        employee._import_manager_ref = row.get("manager_ref") or None
+        return employee
+
+    def resolve_department(self, name):
+        if not name:
+            return None
+        if name not in self.departments:
+            self.created_departments += 1
+            self.departments[name] = (
+                None
+                if self.dry_run
+                else Department.objects.create(organization=self.organization, name=name).pk
+            )
+        return self.departments[name]
+
+    def resolve_position(self, name):
+        if not name:
+            return None
+        if name not in self.positions:
+            self.created_positions += 1
+            self.positions[name] = (
+                None
+                if self.dry_run
+                else Position.objects.create(organization=self.organization, name=name).pk
+            )
+        return self.positions[name]
+
+    def flush(self, batch, done: int) -> int:
+        started = time.perf_counter()
+
+        if not self.dry_run:
+            Employee.objects.bulk_create(batch)
+
+        for employee in batch:
+            if employee._import_ref:
+                if employee._import_ref in self.refs:
+                    self.stdout.write(
+                        self.style.WARNING(f"Duplicate ref {employee._import_ref!r}, keeping the last one")
+                    )
+                self.refs[employee._import_ref] = employee.pk
+            if employee._import_manager_ref:
+                self.pending_managers.append(
+                    (employee.pk, str(employee), employee._import_ref, employee._import_manager_ref)
+                )
+
+        elapsed = time.perf_counter() - started
+        rate = len(batch) / elapsed if elapsed else float("inf")
+        self.stdout.write(
+            f"  batch {done + 1}-{done + len(batch)}: {len(batch)} rows in {elapsed:.3f}s ({rate:.0f} rows/s)"
+        )
+        return len(batch)
+
+    def link_managers(self, batch_size: int) -> int:
+        """Second pass: manager_ref can point at rows that came later in the file."""
+        # by ref, so that cycles are found in dry runs too (no pks there)
+        cyclic = set(
+            cycle_breaks(
+                {
+                    ref: manager_ref
+                    for _, _, ref, manager_ref in self.pending_managers
+                    if ref and manager_ref in self.refs
+                }
+            )
+        )
+
+        to_update = []
+        for pk, label, ref, manager_ref in self.pending_managers:
+            manager_id = self.refs.get(manager_ref)
+            if manager_ref not in self.refs:
+                self.stdout.write(self.style.WARNING(f"Unknown manager_ref {manager_ref!r} for {label}"))
+                continue
+            if ref == manager_ref or (manager_id is not None and manager_id == pk):
+                self.stdout.write(self.style.WARNING(f"{label} cannot be their own manager"))
+                continue
+            if ref in cyclic:
+                self.stdout.write(
+                    self.style.WARNING(f"manager_ref {manager_ref!r} for {label} would close a reporting cycle, skipped")
+                )
+                continue
+            to_update.append(Employee(pk=pk, manager_id=manager_id))
+
+        if to_update and not self.dry_run:
+            started = time.perf_counter()
+            Employee.objects.bulk_update(to_update, ["manager"], batch_size=batch_size)
+            self.stdout.write(
+                f"  linked {len(to_update)} managers in {time.perf_counter() - started:.3f}s"
+            )
+
+        self.pending_managers = []
+        return len(to_update)
@@ -0,0 +1,141 @@
+from datetime import date, timedelta
+
+from django.db.models import Count, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from hr_core.models import Department, Employee, HeadcountSnapshot, HeadcountWatermark, Position
+from platform_core.management.base import OrganizationCommand
+
+
+SNAPSHOT_FIELDS = (
+    "department_id",
+    "department_name",
+    "position_id",
+    "position_name",
+    "employment_status",
+    "employment_type",
+)
+
+
+class Command(OrganizationCommand):
+    help = (
+        "Materialize the daily headcount snapshots read by the ui dashboard. "
+        "When no employee, department or position changed since the last run, the "
+        "previous day's rows are copied forward instead of aggregating employees "
+        "again; any change re-aggregates the whole organization for the day. "
+        "Meant to run daily (and safe to rerun)."
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--date", type=date.fromisoformat, help="Snapshot date, YYYY-MM-DD (default: today)")
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Aggregate employees even if nothing changed (after queryset.update() or raw SQL writes)",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.day = options["date"] or timezone.localdate()
+        self.batch_size = options["batch_size"]
+        super().handle(*args, **options)
+
+    def handle_organization(self, organization, options):
+        return self.materialize(organization, self.day, full=options["full"])
+
+    def describe(self, result):
+        outcome, rows = result
+        return f"{outcome}, {rows} rows"
+
+    def summarize(self, results, options):
+        totals = {"aggregated": 0, "copied": 0, "unchanged": 0, "skipped": 0}
+        for outcome, _ in results:
+            totals[outcome] += 1
+        summary = ", ".join(f"{count} {outcome}" for outcome, count in totals.items())
+        return f"Headcount for {self.day} materialized ({summary})."
+
+    def materialize(self, organization, day, *, full):
+        """Bring the organization's snapshots up to `day`; return (outcome, rows written)."""
+        watermark = HeadcountWatermark.objects.select_for_update().filter(organization=organization).first()
+        if watermark is not None and watermark.date > day:
+            # history is only rewritten on request, and then leaves the watermark alone
+            if not full:
+                return "skipped", 0
+            return "aggregated", self.aggregate(organization, Employee.objects.filter(organization=organization), day)
+
+        # taken before reading employees: a write racing this run is seen again next time
+        seen_at = timezone.now()
+        employees = Employee.objects.filter(organization=organization)
+        sources = {
+            "employees": employees,
+            # snapshots carry department and position names, and deleting either
+            # clears employees' FKs without touching Employee.updated_at
+            "departments": Department.objects.filter(organization=organization),
+            "positions": Position.objects.filter(organization=organization),
+        }
+        counts = {key: rows.count() for key, rows in sources.items()}
+
+        changed = (
+            full
+            or watermark is None
+            # deletions leave no updated_at behind
+            or any(count != getattr(watermark, key) for key, count in counts.items())
+            or any(rows.filter(updated_at__gt=watermark.changes_through).exists() for rows in sources.values())
+        )
+
+        rows = 0
+        if watermark is not None and watermark.date < day:
+            # days the job did not run keep the last known state; changes since
+            # then are attributed to `day`
+            last = day if not changed else day - timedelta(days=1)
+            rows += self.copy_forward(organization, watermark.date, watermark.date + timedelta(days=1), last)
+
+        if changed:
+            rows += self.aggregate(organization, employees, day)
+            outcome = "aggregated"
+        else:
+            outcome = "copied" if rows else "unchanged"
+
+        HeadcountWatermark.objects.update_or_create(
+            organization=organization,
+            defaults={"date": day, "changes_through": seen_at, **counts},
+        )
+        return outcome, rows
+
+    def copy_forward(self, organization, source, first, last):
+        if first > last:
+            return 0
+        snapshots = HeadcountSnapshot.objects.filter(organization=organization)
+        template = list(snapshots.filter(date=source).values(*SNAPSHOT_FIELDS, "headcount"))
+        snapshots.filter(date__gte=first, date__lte=last).delete()
+
+        created = []
+        current = first
+        while current <= last:
+            created += [HeadcountSnapshot(organization=organization, date=current, **row) for row in template]
+            current += timedelta(days=1)
+        HeadcountSnapshot.objects.bulk_create(created, batch_size=self.batch_size)
+        return len(created)
+
+    def aggregate(self, organization, employees, day):
+        groups = (
+            employees.exclude(employment_status=Employee.EmploymentStatus.TERMINATED)
+            .values(
+                "department_id",
+                "position_id",
+                "employment_status",
+                "employment_type",
+                department_name=Coalesce("department__name", Value("")),
+                position_name=Coalesce("position__name", Value("")),
+            )
+            .annotate(headcount=Count("id"))
+            .order_by()
+        )
+        HeadcountSnapshot.objects.filter(organization=organization, date=day).delete()
+        created = HeadcountSnapshot.objects.bulk_create(
+            [HeadcountSnapshot(organization=organization, date=day, **group) for group in groups],
+            batch_size=self.batch_size,
+        )
+        return len(created)
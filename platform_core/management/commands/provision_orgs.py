@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from platform_core.models import Organization
+from platform_core.provisioning import create_organizations
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create organizations with default settings and modules (test / staging load); "
+        "names that already exist are skipped, so a rerun does not duplicate them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=int, help="Number of organizations to create")
+        parser.add_argument("--prefix", default="Organization", help="Name prefix")
+        parser.add_argument("--start", type=int, default=1, help="First sequence number in names")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        batch_size = options["batch_size"]
+        if count < 1 or batch_size < 1:
+            raise CommandError("count and --batch-size must be positive")
+
+        started = time.perf_counter()
+        created = skipped = 0
+        start = options["start"]
+        end = start + count
+
+        for first in range(start, end, batch_size):
+            batch_started = time.perf_counter()
+            names = [f"{options['prefix']} {n}" for n in range(first, min(first + batch_size, end))]
+            # rerunning a load (e.g. after an interruption) skips what is already there
+            existing = set(Organization.objects.filter(name__in=names).values_list("name", flat=True))
+            create_organizations([name for name in names if name not in existing], batch_size=batch_size)
+            created += len(names) - len(existing)
+            skipped += len(existing)
+            self.stdout.write(
+                f"  {created + skipped}/{count} organizations ({time.perf_counter() - batch_started:.2f}s)"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Provisioned {created} organizations ({skipped} already existed) "
+                f"in {time.perf_counter() - started:.2f}s."
+            )
+        )
@@ -0,0 +1,23 @@
+from hr_core.models import DocumentToken, EmployeeDocument
+from platform_core.management.base import OrganizationCommand
+
+
+class Command(OrganizationCommand):
+    help = "Rebuild the EmployeeDocument search index (after bulk imports or direct SQL writes)"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle_organization(self, organization, options):
+        DocumentToken.objects.filter(organization=organization).delete()
+        return DocumentToken.objects.index(
+            EmployeeDocument.objects.filter(organization=organization).iterator(chunk_size=options["batch_size"]),
+            batch_size=options["batch_size"],
+        )
+
+    def describe(self, written):
+        return f"{written} tokens"
+
+    def summarize(self, results, options):
+        return f"Document index rebuilt ({sum(results)} tokens)."
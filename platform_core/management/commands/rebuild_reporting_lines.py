@@ -0,0 +1,22 @@
+from hr_core.models import Employee, ReportingLine
+from platform_core.management.base import OrganizationCommand
+
+
+class Command(OrganizationCommand):
+    help = "Rebuild the Employee.manager closure table (after bulk imports or direct SQL writes)"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle_organization(self, organization, options):
+        return ReportingLine.objects.rebuild(
+            Employee.objects.filter(organization=organization),
+            batch_size=options["batch_size"],
+        )
+
+    def describe(self, created):
+        return f"{created} reporting lines"
+
+    def summarize(self, results, options):
+        return f"Reporting lines rebuilt ({sum(results)} rows)."
@@ -0,0 +1,19 @@
+from hr_core.models import Employee
+from platform_core.management.base import OrganizationCommand
+
+
+class Command(OrganizationCommand):
+    help = "Recompute the employee typeahead keys (after direct SQL writes or bulk_update of names)"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle_organization(self, organization, options):
+        return Employee.objects.filter(organization=organization).refresh_search_keys(batch_size=options["batch_size"])
+
+    def describe(self, updated):
+        return f"{updated} employees"
+
+    def summarize(self, results, options):
+        return f"Search keys rebuilt ({sum(results)} employees)."
@@ -0,0 +1,99 @@
+import logging
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from hr_core.models import Employee
+from hr_core.signals import employees_updated
+from platform_core.management.base import OrganizationCommand
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(OrganizationCommand):
+    help = (
+        "Per-organization digest of probations ending within a window and of "
+        "probations already over; with --activate, move the latter to ACTIVE "
+        "(one UPDATE per organization). Meant to run daily."
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--date", type=date.fromisoformat, help="Scan as of YYYY-MM-DD (default: today)")
+        parser.add_argument("--days", type=int, default=14, help="Window of upcoming probation ends (default: 14)")
+        parser.add_argument(
+            "--activate",
+            action="store_true",
+            help="Move employees whose probation ended before the scan date to ACTIVE",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0:
+            raise CommandError("--days must not be negative")
+        day = options["date"] or timezone.localdate()
+        window_end = day + timedelta(days=options["days"])
+
+        organizations = self.organizations(options)
+
+        started = time.perf_counter()
+        totals = {"ending": 0, "expired": 0, "activated": 0}
+        for organization in organizations:
+            counts = self.scan(organization, day, window_end, activate=options["activate"])
+            for key in totals:
+                totals[key] += counts[key]
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Probation scan %s..%s: %d ending, %d expired, %d activated in %.3fs",
+            day, window_end, totals["ending"], totals["expired"], totals["activated"], elapsed,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{totals['ending']} probations end by {window_end}, {totals['expired']} already ended, "
+                f"{totals['activated']} moved to ACTIVE in {elapsed:.2f}s."
+            )
+        )
+
+    def scan(self, organization, day, window_end, *, activate):
+        started = time.perf_counter()
+        employees = Employee.objects.filter(organization=organization)
+
+        # both lookups are range scans of employee_org_probation_idx
+        ending = list(
+            employees.probation_ending(day, window_end)
+            .select_related("department")
+            .only("id", "first_name", "last_name", "probation_end_date", "department__name")
+            .order_by("probation_end_date", "last_name", "id")
+        )
+        if activate:
+            with transaction.atomic():
+                expired = employees.complete_probation(day)
+                if expired:
+                    employees_updated.send(sender=Employee, employee_ids=expired)
+            expired_count = activated = len(expired)
+        else:
+            expired_count = employees.probation_ending(date.min, day - timedelta(days=1)).count()
+            activated = 0
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Probation scan org=%s: %d ending, %d expired, %d activated in %.3fs",
+            organization.pk, len(ending), expired_count, activated, elapsed,
+        )
+
+        if ending or expired_count:
+            self.stdout.write(f"{organization}:")
+            for employee in ending:
+                department = employee.department.name if employee.department else "—"
+                self.stdout.write(
+                    f"  {employee.probation_end_date}  {employee.last_name} {employee.first_name} "
+                    f"({employee.pk}, {department})"
+                )
+            if expired_count:
+                verb = "moved to ACTIVE" if activate else "already ended, still on PROBATION"
+                self.stdout.write(f"  {expired_count} {verb}")
+        return {"ending": len(ending), "expired": expired_count, "activated": activated}
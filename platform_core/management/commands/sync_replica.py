@@ -0,0 +1,50 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from platform_core.routers import replica_alias
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the default SQLite database into the read replica file (local stand-in "
+        "for replication). Uses the SQLite backup API, so it is safe while both are in use."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=1024,
+            help="Pages copied per step; other connections can run between steps",
+        )
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError("No replica configured (set HR_PORTAL_REPLICA_DB)")
+        source_settings, replica_settings = settings.DATABASES["default"], settings.DATABASES[alias]
+        if not all(s["ENGINE"] == "django.db.backends.sqlite3" for s in (source_settings, replica_settings)):
+            raise CommandError("sync_replica only copies SQLite databases")
+
+        started = time.perf_counter()
+        # copy into the existing file rather than replacing it, so that open
+        # (persistent) replica connections see the new contents
+        source = sqlite3.connect(source_settings["NAME"])
+        target = sqlite3.connect(replica_settings["NAME"])
+        try:
+            source.backup(target, pages=options["pages"])
+        finally:
+            source.close()
+            target.close()
+        connections[alias].close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Copied {source_settings['NAME']} to {replica_settings['NAME']} "
+                f"in {time.perf_counter() - started:.2f}s."
+            )
+        )
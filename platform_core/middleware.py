@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+
+from .decorators import module_allowed
+from .routers import replica_alias, reset_read_alias, route_iterator, set_read_alias
+
+
+class ModuleGateMiddleware:
+    """
+    Gate whole URL prefixes (e.g. admin apps) by org module, as configured
+    in ORG_MODULE_ROUTES. Views decorated with @module_required are checked
+    by the decorator itself. Must come after AccessContextMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        for prefix, code in settings.ORG_MODULE_ROUTES.items():
+            if request.path.startswith(prefix):
+                if not module_allowed(request, code):
+                    raise PermissionDenied(f"Module {code} is not enabled for this organization")
+                break
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve safe requests to REPLICA_ROUTED_NAMESPACES views (the read-only ui)
+    from the read replica, see routers.py. Unsafe requests set a pin cookie
+    that keeps the user on "default" for REPLICA_STICKY_SECONDS. Should come
+    right after RequestMetricsMiddleware so that it routes every view query.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.read_alias = None
+        try:
+            response = self.get_response(request)
+        finally:
+            token = getattr(request, "_read_alias_token", None)
+            if token is not None:
+                reset_read_alias(token)
+
+        if request.read_alias and response.streaming:
+            response.streaming_content = route_iterator(response.streaming_content, request.read_alias)
+
+        if request.method not in self.SAFE_METHODS and replica_alias():
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        alias = replica_alias()
+        if (
+            alias
+            and request.method in self.SAFE_METHODS
+            and request.resolver_match.namespace in settings.REPLICA_ROUTED_NAMESPACES
+            and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+        ):
+            request.read_alias = alias
+            request._read_alias_token = set_read_alias(alias)
+        return None
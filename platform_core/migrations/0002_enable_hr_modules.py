@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 19:02
+
+from django.db import migrations
+
+
+# enabled by default since module gating, see provisioning.DEFAULT_ENABLED_MODULES
+MODULES = ("HR", "ORG_STRUCTURE")
+
+
+def enable_modules(apps, schema_editor):
+    Organization = apps.get_model("platform_core", "Organization")
+    OrgModule = apps.get_model("platform_core", "OrgModule")
+    OrgModule.objects.bulk_create(
+        [
+            OrgModule(organization_id=organization_id, code=code, enabled=True)
+            for organization_id in Organization.objects.values_list("id", flat=True)
+            for code in MODULES
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    OrgModule.objects.filter(code__in=MODULES).update(enabled=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(enable_modules, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-18 21:20
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    Organization = apps.get_model("platform_core", "Organization")
+    Organization.objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_core', '0002_enable_hr_modules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
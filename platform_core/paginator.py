@@ -0,0 +1,21 @@
+"""
+Paginator for admin changelists over large tables.
+
+Django's changelist pages with a full COUNT(*) of the filtered queryset.
+CappedCountPaginator counts at most ADMIN_COUNT_CAP rows through a LIMITed
+subquery, so the count stops early on big tenants; past the cap the
+changelist shows ADMIN_COUNT_CAP results and the matching number of pages.
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+class CappedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        cap = settings.ADMIN_COUNT_CAP
+        if cap is None or not hasattr(self.object_list, "count"):
+            return super().count
+        # SELECT COUNT(*) FROM (SELECT ... LIMIT cap)
+        return self.object_list[:cap].count()
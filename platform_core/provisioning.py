@@ -0,0 +1,65 @@
+from django.db import transaction
+
+from .models import Organization, OrgSettings, OrgModule
+from .registry import org_registry
+
+
+DEFAULT_MODULES = [
+    'PLATFORM',
+    'TIME_TRACKING',
+    'HR',
+    'LEAVE',
+    'PAYROLL',
+    'ORG_STRUCTURE',
+]
+
+# Platform включён по умолчанию; HR and ORG_STRUCTURE back the ui and the
+# hr_core admin, which are gated by module (ORG_MODULE_GATING)
+DEFAULT_ENABLED_MODULES = {'PLATFORM', 'HR', 'ORG_STRUCTURE'}
+
+
+def provision_organizations(organizations, batch_size=1000):
+    """
+    Create the default OrgSettings and OrgModule rows for saved organizations.
+
+    Two bulk INSERTs in one transaction regardless of how many organizations
+    are passed; rows that already exist are left untouched.
+    """
+    organizations = list(organizations)
+    if not organizations:
+        return
+
+    with transaction.atomic():
+        OrgSettings.objects.bulk_create(
+            [OrgSettings(organization=org) for org in organizations],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        OrgModule.objects.bulk_create(
+            [
+                OrgModule(
+                    organization=org,
+                    code=code,
+                    enabled=code in DEFAULT_ENABLED_MODULES,
+                )
+                for org in organizations
+                for code in DEFAULT_MODULES
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+    # bulk_create sends no post_save, so the registry is not told otherwise
+    for org in organizations:
+        org_registry.invalidate(org.pk)
+
+
+def create_organizations(names, batch_size=1000) -> list[Organization]:
+    """Bulk-create organizations and provision them in the same transaction."""
+    with transaction.atomic():
+        organizations = Organization.objects.bulk_create(
+            [Organization(name=name) for name in names],
+            batch_size=batch_size,
+        )
+        provision_organizations(organizations, batch_size=batch_size)
+    return organizations
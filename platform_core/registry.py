@@ -0,0 +1,87 @@
+"""
+Process-local registry of per-organization settings and enabled modules.
+
+Each worker keeps up to ORG_REGISTRY_MAX_ENTRIES organizations (least
+recently used evicted first) for ORG_REGISTRY_TTL seconds, so module checks
+cost no queries on a warm cache. post_save/post_delete on OrgSettings and
+OrgModule invalidate the entry in the process that made the change; other
+workers pick the change up when their entry expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import OrgModule, OrgSettings
+
+
+class OrgConfig:
+    def __init__(self, organization_id, settings=None, enabled_modules=frozenset()):
+        self.organization_id = organization_id
+        self.settings = settings or {}
+        self.enabled_modules = frozenset(enabled_modules)
+
+    def is_enabled(self, code: str) -> bool:
+        return code in self.enabled_modules
+
+    def __repr__(self) -> str:
+        return f"<OrgConfig org={self.organization_id} modules={sorted(self.enabled_modules)}>"
+
+
+class OrgRegistry:
+    def __init__(self, ttl=None, max_entries=None):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl if self._ttl is not None else settings.ORG_REGISTRY_TTL
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries if self._max_entries is not None else settings.ORG_REGISTRY_MAX_ENTRIES
+
+    def get(self, organization_id) -> OrgConfig:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(organization_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(organization_id)
+                return entry[1]
+
+        config = self._load(organization_id)
+
+        with self._lock:
+            self._entries[organization_id] = (now + self.ttl, config)
+            self._entries.move_to_end(organization_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return config
+
+    def is_enabled(self, organization_id, code: str) -> bool:
+        return self.get(organization_id).is_enabled(code)
+
+    def invalidate(self, organization_id=None) -> None:
+        with self._lock:
+            if organization_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(organization_id, None)
+
+    def _load(self, organization_id) -> OrgConfig:
+        org_settings = (
+            OrgSettings.objects.filter(organization_id=organization_id)
+            .values("timezone", "language", "currency", "date_format")
+            .first()
+        )
+        modules = OrgModule.objects.filter(
+            organization_id=organization_id,
+            enabled=True,
+        ).values_list("code", flat=True)
+        return OrgConfig(organization_id, org_settings, modules)
+
+
+org_registry = OrgRegistry()
@@ -0,0 +1,95 @@
+"""
+Read replica routing.
+
+Writes, migrations and auth/session reads always use "default". Reads of
+REPLICA_APPS models go to REPLICA_DATABASE only inside reads_from() (or
+while ReplicaRoutingMiddleware routes a request), so nothing moves to the
+replica unless a caller opted in: ui page views and reporting commands.
+
+The replica may lag. Users who just wrote something get a pin cookie for
+REPLICA_STICKY_SECONDS and read from "default" until it expires, so they
+see their own writes. Other users may see the previous state until the
+replica catches up (sync_replica locally). Pages rendered from the replica
+are never written to the detail fragment cache, which is shared by all
+users and outlives the pin.
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+# models whose reads may be served from the replica; auth and sessions
+# stay on "default" so a fresh login or password change is never stale
+REPLICA_APPS = frozenset({"hr_core", "platform_core"})
+
+_read_alias = contextvars.ContextVar("read_alias", default=None)
+
+
+def replica_alias():
+    """The configured replica alias, or None when there is no replica."""
+    alias = settings.REPLICA_DATABASE
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def current_read_alias():
+    return _read_alias.get()
+
+
+def set_read_alias(alias):
+    """Route reads to `alias` until reset_read_alias(token); for middleware."""
+    return _read_alias.set(alias)
+
+
+def reset_read_alias(token):
+    _read_alias.reset(token)
+
+
+@contextmanager
+def reads_from(alias):
+    """Route REPLICA_APPS reads in this block to `alias` (None: default)."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def replica_reads():
+    """reads_from() the configured replica; a no-op without one."""
+    return reads_from(replica_alias())
+
+
+def route_iterator(iterable, alias):
+    """
+    Iterate `iterable` with reads routed to `alias`; for streaming responses,
+    whose content is produced after the middleware has returned.
+    """
+    iterator = iter(iterable)
+    while True:
+        token = _read_alias.set(alias)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _read_alias.reset(token)
+        yield chunk
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias and model._meta.app_label in REPLICA_APPS:
+            return alias
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica is a copy of default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
@@ -1,17 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from .models import Organization, OrgSettings, OrgModule
-
-
-DEFAULT_MODULES = [
-    'PLATFORM',
-    'TIME_TRACKING',
-    'HR',
-    'LEAVE',
-    'PAYROLL',
-    'ORG_STRUCTURE',
-]
+from .provisioning import provision_organizations
+from .registry import org_registry
 
 
 @receiver(post_save, sender=Organization)
@@ -19,13 +11,13 @@ def create_defaults_for_organization(sender, instance: Organization, created: bo
     if not created:
         return
 
-    # 1) Settings
-    OrgSettings.objects.get_or_create(organization=instance)
+    # Settings + modules in two bulk inserts
+    provision_organizations([instance])
+
 
-    # 2) Modules
-    for code in DEFAULT_MODULES:
-        OrgModule.objects.get_or_create(
-            organization=instance,
-            code=code,
-            defaults={'enabled': code == 'PLATFORM'}  # Platform включён по умолчанию
-        )
+@receiver(post_save, sender=OrgSettings)
+@receiver(post_delete, sender=OrgSettings)
+@receiver(post_save, sender=OrgModule)
+@receiver(post_delete, sender=OrgModule)
+def invalidate_org_registry(sender, instance, **kwargs):
+    org_registry.invalidate(instance.organization_id)
@@ -0,0 +1,174 @@
+"""
+Synthetic organizations for local load testing, benchmarks and tests.
+
+Everything is written with bulk inserts. The model-level hooks that
+bulk_create bypasses (department paths, employee search keys, the
+reporting-line closure table, the document index) are filled in explicitly
+here.
+"""
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+
+from accounts.access import ROLE_EMPLOYEE, ROLE_HR_MANAGER, ROLE_ORG_ADMIN
+from hr_core.models import Department, DocumentToken, Employee, EmployeeDocument, Position, ReportingLine
+from platform_core.provisioning import create_organizations
+
+
+FIRST_NAMES = [
+    "Alex", "Maria", "Ivan", "Sofia", "Daniel", "Elena", "Carlos", "Anna", "Mateo", "Olga",
+    "Lucas", "Valentina", "Pavel", "Camila", "Sergei", "Isabella", "Diego", "Natalia", "Andres", "Irina",
+]
+LAST_NAMES = [
+    "Garcia", "Ivanov", "Rodriguez", "Petrova", "Martinez", "Smirnov", "Lopez", "Kuznetsova",
+    "Gonzalez", "Popov", "Hernandez", "Volkova", "Perez", "Sokolov", "Sanchez", "Morozova",
+    "Ramirez", "Lebedev", "Torres", "Novikova",
+]
+POSITION_NAMES = [
+    "Engineer", "Senior Engineer", "Team Lead", "Manager", "Director", "Analyst",
+    "Designer", "Accountant", "Recruiter", "Support Specialist", "Sales Representative", "Intern",
+]
+
+
+def generate_organization(
+    name,
+    *,
+    employees=100,
+    department_depth=3,
+    department_fanout=3,
+    span=6,
+    documents_per_employee=1,
+    with_users=True,
+    seed=None,
+    batch_size=1000,
+):
+    """
+    Create one organization with departments, positions, a manager tree
+    (each manager has up to `span` reports) and URL-only documents.
+
+    With `with_users`, one ORG_ADMIN, HR_MANAGER and EMPLOYEE user is linked
+    to the first three employees; they are returned in `users` by role.
+    """
+    rng = random.Random(seed)
+
+    with transaction.atomic():
+        organization = create_organizations([name])[0]
+
+        departments = _generate_departments(organization, department_depth, department_fanout, batch_size)
+        positions = Position.objects.bulk_create(
+            [Position(organization=organization, name=n) for n in POSITION_NAMES],
+            batch_size=batch_size,
+        )
+
+        people = _generate_employees(organization, employees, departments, positions, rng, batch_size)
+
+        # heap-shaped manager tree: employee i reports to (i - 1) // span
+        for i, employee in enumerate(people[1:], start=1):
+            employee.manager_id = people[(i - 1) // span].pk
+        Employee.objects.bulk_update(people[1:], ["manager"], batch_size=batch_size)
+        ReportingLine.objects.rebuild(
+            Employee.objects.filter(organization=organization),
+            batch_size=batch_size,
+        )
+
+        documents = EmployeeDocument.objects.bulk_create(
+            _generate_documents(organization, people, documents_per_employee, rng),
+            batch_size=batch_size,
+        )
+        DocumentToken.objects.index(documents, batch_size=batch_size)
+
+        users = _generate_users(organization, people) if with_users else {}
+
+    return organization, users
+
+
+def _generate_departments(organization, depth, fanout, batch_size):
+    created = []
+    parents = [None]
+    for level in range(depth):
+        level_departments = [
+            Department(
+                organization=organization,
+                name=f"Department {level + 1}.{len(created) + i + 1}",
+                parent=parent,
+            )
+            for i, parent in enumerate(p for p in parents for _ in range(1 if level == 0 else fanout))
+        ]
+        Department.objects.bulk_create(level_departments, batch_size=batch_size)
+        for department in level_departments:
+            parent_path = department.parent.path if department.parent else "/"
+            department.path = f"{parent_path}{department.pk}/"
+            department.depth = level
+        Department.objects.bulk_update(level_departments, ["path", "depth"], batch_size=batch_size)
+        created += level_departments
+        parents = level_departments
+    return created
+
+
+def _generate_employees(organization, count, departments, positions, rng, batch_size):
+    today = date.today()
+    people = []
+    for _ in range(count):
+        status = rng.choices(
+            Employee.EmploymentStatus.values,
+            weights=[85, 10, 5],
+        )[0]
+        hire_date = today - timedelta(days=rng.randint(0, 3650))
+        probation_start = probation_end = None
+        if status == Employee.EmploymentStatus.PROBATION:
+            probation_start = today - timedelta(days=rng.randint(0, 80))
+            probation_end = probation_start + timedelta(days=90)
+            hire_date = probation_start
+
+        people.append(
+            Employee(
+                organization=organization,
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                employment_status=status,
+                employment_type=rng.choices(Employee.EmploymentType.values, weights=[90, 10])[0],
+                hire_date=hire_date,
+                probation_start_date=probation_start,
+                probation_end_date=probation_end,
+                department=rng.choice(departments) if departments else None,
+                position=rng.choice(positions) if positions else None,
+            )
+        )
+    for employee in people:
+        employee.set_search_keys()
+    return Employee.objects.bulk_create(people, batch_size=batch_size)
+
+
+def _generate_documents(organization, people, per_employee, rng):
+    doc_types = EmployeeDocument.DocumentType.values
+    for employee in people:
+        for n in range(per_employee):
+            doc_type = rng.choice(doc_types)
+            yield EmployeeDocument(
+                organization=organization,
+                employee=employee,
+                doc_type=doc_type,
+                title=f"{doc_type.title()} {n + 1}",
+                identifier=f"{employee.pk}-{n + 1}",
+                url=f"https://docs.example.com/{organization.pk}/{employee.pk}/{n + 1}",
+            )
+
+
+def _generate_users(organization, people):
+    User = get_user_model()
+    users = {}
+    for role, employee in zip((ROLE_ORG_ADMIN, ROLE_HR_MANAGER, ROLE_EMPLOYEE), people):
+        user = User(
+            username=f"org{organization.pk}-{role.lower()}",
+            organization=organization,
+            is_staff=True,
+        )
+        user.set_unusable_password()
+        user.save()
+        user.groups.add(Group.objects.get_or_create(name=role)[0])
+        Employee.objects.filter(pk=employee.pk).update(user=user)
+        users[role] = user
+    return users
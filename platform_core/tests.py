@@ -1,3 +1,403 @@
-from django.test import TestCase
+import copy
+import os
+import runpy
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.utils import ConnectionHandler
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.access import ROLE_EMPLOYEE, ROLE_HR_MANAGER, ROLE_ORG_ADMIN, AccessContext
+from hr_core.models import Employee, ReportingLine
+from platform_core import instrumentation
+from platform_core.instrumentation import QueryBudgetExceeded, metrics_snapshot
+from platform_core.models import Organization, OrgModule, OrgSettings
+from platform_core.provisioning import (
+    DEFAULT_ENABLED_MODULES,
+    DEFAULT_MODULES,
+    create_organizations,
+    provision_organizations,
+)
+from platform_core.registry import OrgRegistry, org_registry
+from platform_core.routers import ReplicaRouter, reads_from
+from platform_core.synthetic import generate_organization
+from ui import detail_cache
+
+
+# a second alias cannot see a TestCase's uncommitted rows, so routing is
+# exercised with "default" standing in as the replica
+@override_settings(REPLICA_DATABASE="default")
+class ReplicaRoutingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Routing", employees=5, seed=1)
+
+    def test_router(self):
+        router = ReplicaRouter()
+
+        self.assertEqual(router.db_for_read(Employee), "default")
+        with reads_from("replica"):
+            self.assertEqual(router.db_for_read(Employee), "replica")
+            # auth and sessions never read from the replica
+            self.assertEqual(router.db_for_read(get_user_model()), "default")
+            self.assertEqual(router.db_for_write(Employee), "default")
+        self.assertFalse(router.allow_migrate("replica", "hr_core"))
+        self.assertTrue(router.allow_migrate("default", "hr_core"))
+
+    def test_ui_reads_are_routed_until_the_user_writes(self):
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+
+        response = self.client.get(reverse("ui:employee_list"))
+        self.assertEqual(response.wsgi_request.read_alias, "default")
+
+        response = self.client.get(reverse("admin:hr_core_employee_changelist"))
+        self.assertIsNone(response.wsgi_request.read_alias)
+
+        self.client.force_login(self.users[ROLE_ORG_ADMIN])
+        employee = Employee.objects.get(user=self.users[ROLE_ORG_ADMIN])
+        response = self.client.post(
+            reverse("admin:hr_core_employee_change", args=[employee.pk]),
+            {
+                "organization": employee.organization_id,
+                "user": employee.user_id,
+                "first_name": "Renamed",
+                "last_name": employee.last_name,
+                "employment_status": employee.employment_status,
+                "employment_type": employee.employment_type,
+                "documents-TOTAL_FORMS": 0,
+                "documents-INITIAL_FORMS": 0,
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("db_pin", response.cookies)
+
+        # pinned: read-your-writes from default
+        response = self.client.get(reverse("ui:employee_list"))
+        self.assertIsNone(response.wsgi_request.read_alias)
+        self.assertContains(response, "Renamed")
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_no_replica_no_routing(self):
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+
+        response = self.client.get(reverse("ui:employee_list"))
+
+        self.assertIsNone(response.wsgi_request.read_alias)
+        self.assertNotIn("db_pin", response.cookies)
+
+
+    def test_replica_reads_are_not_cached(self):
+        # ids repeat across rolled-back tests; start from an empty cache
+        caches[settings.UI_DETAIL_CACHE_ALIAS].clear()
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+        access = AccessContext.for_user(self.users[ROLE_HR_MANAGER])
+        employee = Employee.objects.get(user=self.users[ROLE_EMPLOYEE])
+        url = reverse("ui:employee_detail", args=[employee.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(response.wsgi_request.read_alias, "default")
+        self.assertIsNone(detail_cache.get_fragment(employee.pk, access))
+
+        # pinned after a write: reads from default, which may be cached
+        self.client.cookies["db_pin"] = "1"
+        response = self.client.get(url)
+        self.assertIsNone(response.wsgi_request.read_alias)
+        self.assertIsNotNone(detail_cache.get_fragment(employee.pk, access))
+
+
+class OrgRegistryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizations = [Organization.objects.create(name=f"Org {n}") for n in range(3)]
+
+    def setUp(self):
+        self.registry = OrgRegistry(ttl=60, max_entries=2)
+        self.clock = 1000.0
+        patcher = mock.patch("platform_core.registry.time.monotonic", side_effect=lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_new_organizations_get_the_ui_modules(self):
+        config = self.registry.get(self.organizations[0].pk)
+
+        self.assertEqual(config.enabled_modules, {"PLATFORM", "HR", "ORG_STRUCTURE"})
+
+    def test_entries_are_served_until_they_expire(self):
+        first = self.organizations[0].pk
+        self.registry.get(first)
+
+        with self.assertNumQueries(0):
+            self.registry.get(first)
+
+        self.clock += 61
+        with self.assertNumQueries(2):
+            self.registry.get(first)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        first, second, third = (org.pk for org in self.organizations)
+        self.registry.get(first)
+        self.registry.get(second)
+        self.registry.get(first)
+        self.registry.get(third)
+
+        with self.assertNumQueries(0):
+            self.registry.get(first)
+            self.registry.get(third)
+        with self.assertNumQueries(2):
+            self.registry.get(second)
+
+    def test_invalidate(self):
+        first, second = self.organizations[0].pk, self.organizations[1].pk
+        self.registry.get(first)
+        self.registry.get(second)
+
+        self.registry.invalidate(first)
+        with self.assertNumQueries(2):
+            self.registry.get(first)
+        with self.assertNumQueries(0):
+            self.registry.get(second)
+
+        self.registry.invalidate()
+        with self.assertNumQueries(2):
+            self.registry.get(second)
+
+    def test_module_changes_invalidate_the_shared_registry(self):
+        organization = self.organizations[0]
+        self.assertTrue(org_registry.is_enabled(organization.pk, "HR"))
+
+        module = OrgModule.objects.get(organization=organization, code="HR")
+        module.enabled = False
+        module.save()
+
+        self.assertFalse(org_registry.is_enabled(organization.pk, "HR"))
+        org_registry.invalidate(organization.pk)
+
+
+class ModuleGateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Gated", employees=5, seed=1)
+
+    def setUp(self):
+        # the registry is process-wide and outlives each test's rollback
+        org_registry.invalidate()
+        self.addCleanup(org_registry.invalidate)
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+
+    def disable(self, code):
+        module = OrgModule.objects.get(organization=self.organization, code=code)
+        module.enabled = False
+        module.save()
+
+    def test_enabled_modules_are_reachable(self):
+        self.assertEqual(self.client.get(reverse("ui:employee_list")).status_code, 200)
+        self.assertEqual(self.client.get(reverse("ui:department_list")).status_code, 200)
+        self.assertEqual(self.client.get(reverse("admin:hr_core_employee_changelist")).status_code, 200)
+
+    def test_disabled_module_is_forbidden(self):
+        self.disable("HR")
+
+        # @module_required
+        self.assertEqual(self.client.get(reverse("ui:employee_list")).status_code, 403)
+        # ModuleGateMiddleware (ORG_MODULE_ROUTES)
+        self.assertEqual(self.client.get(reverse("admin:hr_core_employee_changelist")).status_code, 403)
+        # other modules are unaffected
+        self.assertEqual(self.client.get(reverse("ui:department_list")).status_code, 200)
+
+    def test_gating_can_be_turned_off(self):
+        self.disable("HR")
+
+        with self.settings(ORG_MODULE_GATING=False):
+            self.assertEqual(self.client.get(reverse("ui:employee_list")).status_code, 200)
+            self.assertEqual(self.client.get(reverse("admin:hr_core_employee_changelist")).status_code, 200)
+
+
+class ProvisioningTests(TestCase):
+    def modules(self, organizations):
+        return set(
+            OrgModule.objects.filter(organization__in=organizations).values_list("organization_id", "code", "enabled")
+        )
+
+    def expected_modules(self, organizations):
+        return {
+            (organization.pk, code, code in DEFAULT_ENABLED_MODULES)
+            for organization in organizations
+            for code in DEFAULT_MODULES
+        }
+
+    def test_query_count_does_not_grow_with_organizations(self):
+        counts = []
+        for size in (2, 20):
+            with CaptureQueriesContext(connection) as captured:
+                organizations = create_organizations([f"Bulk {size}.{n}" for n in range(size)])
+            counts.append(len(captured))
+
+            self.assertEqual(len(organizations), size)
+            self.assertEqual(OrgSettings.objects.filter(organization__in=organizations).count(), size)
+            self.assertEqual(self.modules(organizations), self.expected_modules(organizations))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_provisioning_again_leaves_existing_rows_alone(self):
+        organizations = create_organizations(["Again 1", "Again 2"])
+        OrgModule.objects.filter(organization=organizations[0], code="HR").update(enabled=False)
+        before = self.modules(organizations)
+
+        provision_organizations(organizations)
+
+        self.assertEqual(self.modules(organizations), before)
+        self.assertEqual(OrgSettings.objects.filter(organization__in=organizations).count(), 2)
+
+    def test_single_organization_is_provisioned_on_save(self):
+        organization = Organization.objects.create(name="Single")
+
+        self.assertTrue(OrgSettings.objects.filter(organization=organization).exists())
+        self.assertEqual(self.modules([organization]), self.expected_modules([organization]))
+
+    def test_command_rerun_skips_existing_names(self):
+        call_command("provision_orgs", 3, prefix="Staging", batch_size=2, stdout=StringIO())
+        out = StringIO()
+        call_command("provision_orgs", 5, prefix="Staging", batch_size=2, stdout=out)
+
+        organizations = Organization.objects.filter(name__startswith="Staging ")
+        self.assertEqual(
+            sorted(organizations.values_list("name", flat=True)),
+            [f"Staging {n}" for n in range(1, 6)],
+        )
+        self.assertIn("Provisioned 2 organizations (3 already existed)", out.getvalue())
+        self.assertEqual(OrgSettings.objects.filter(organization__in=organizations).count(), 5)
+        self.assertEqual(self.modules(organizations), self.expected_modules(organizations))
+
+
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Metrics", employees=5, seed=1)
+
+    def setUp(self):
+        instrumentation.histogram.reset()
+        self.addCleanup(instrumentation.histogram.reset)
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+        self.url = reverse("ui:position_list")
+
+    def test_server_timing_reports_the_request_queries(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url)
+
+        timing = response["Server-Timing"]
+        self.assertIn(f'desc="{len(captured)} queries"', timing)
+        for metric in ("db;dur=", "tpl;dur=", "total;dur="):
+            self.assertIn(metric, timing)
+
+    def test_histogram_keeps_samples_per_view(self):
+        for _ in range(3):
+            self.client.get(self.url)
+        self.client.get(reverse("ui:department_list"))
+
+        with mock.patch.object(instrumentation, "percentile", wraps=instrumentation.percentile) as percentile:
+            snapshot = metrics_snapshot()
+
+        self.assertEqual(snapshot["ui:position_list"]["count"], 3)
+        self.assertEqual(snapshot["ui:department_list"]["count"], 1)
+        queries = snapshot["ui:position_list"]["queries"]
+        self.assertTrue(0 < queries["p50"] <= queries["p99"] <= queries["max"])
+        # three percentiles for each of the five fields of both views
+        self.assertEqual(percentile.call_count, 2 * 5 * 3)
+
+    @override_settings(QUERY_BUDGETS={"ui:position_list": 1}, QUERY_BUDGET_STRICT=True)
+    def test_strict_budget_raises(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, "ui:position_list ran"):
+            self.client.get(self.url)
+
+    @override_settings(QUERY_BUDGETS={"ui:position_list": 1}, QUERY_BUDGET_STRICT=False)
+    def test_budget_breach_is_logged(self):
+        with self.assertLogs("platform_core.instrumentation", "WARNING") as logs:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ui:position_list ran", logs.output[0])
+        self.assertIn("(budget 1)", logs.output[0])
+
+
+class DatabaseProfileTests(TestCase):
+    def load_settings(self, profile):
+        with mock.patch.dict(os.environ, {"HR_PORTAL_DB_PROFILE": profile}):
+            return runpy.run_path(str(Path(settings.BASE_DIR) / "config" / "settings.py"))
+
+    def pragmas(self, profile):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        handler = ConnectionHandler(
+            {
+                "default": {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": str(Path(directory.name) / "profile.sqlite3"),
+                    **copy.deepcopy(settings.DATABASE_PROFILES[profile]),
+                }
+            }
+        )
+        self.addCleanup(handler.close_all)
+        with handler["default"].cursor() as cursor:
+            return {
+                name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in ("journal_mode", "busy_timeout", "synchronous")
+            }
+
+    def test_profile_is_selected_from_the_environment(self):
+        tuned = self.load_settings("tuned")
+        self.assertEqual(tuned["DATABASE_PROFILE"], "tuned")
+        self.assertEqual(tuned["DATABASES"]["default"]["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+        self.assertEqual(tuned["DATABASES"]["default"]["CONN_MAX_AGE"], 600)
+
+        baseline = self.load_settings("default")
+        self.assertNotIn("OPTIONS", baseline["DATABASES"]["default"])
+        self.assertNotIn("CONN_MAX_AGE", baseline["DATABASES"]["default"])
+
+        with self.assertRaisesMessage(ImproperlyConfigured, "HR_PORTAL_DB_PROFILE='fast'"):
+            self.load_settings("fast")
+
+    def test_tuned_connections_run_the_pragmas(self):
+        # synchronous: 1 = NORMAL, 2 = FULL
+        self.assertEqual(self.pragmas("tuned"), {"journal_mode": "wal", "busy_timeout": 20000, "synchronous": 1})
+
+    def test_default_profile_keeps_sqlite_defaults(self):
+        self.assertEqual(self.pragmas("default"), {"journal_mode": "delete", "busy_timeout": 5000, "synchronous": 2})
+
+
+class OrganizationCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.first, _ = generate_organization("First", employees=6, documents_per_employee=0, seed=1)
+        cls.second, _ = generate_organization("Second", employees=4, documents_per_employee=0, seed=2)
+
+    def test_runs_each_organization_or_only_the_one_asked_for(self):
+        lines = ReportingLine.objects.filter(descendant__organization=self.second).count()
+        out = StringIO()
+        call_command("rebuild_reporting_lines", stdout=out)
+        output = out.getvalue().splitlines()
+        self.assertTrue(output[0].startswith("First: "))
+        self.assertTrue(output[1].startswith(f"Second: {lines} reporting lines in "))
+        self.assertEqual(output[2], f"Reporting lines rebuilt ({ReportingLine.objects.count()} rows).")
+
+        out = StringIO()
+        call_command("rebuild_reporting_lines", organization=self.second.pk, stdout=out)
+        self.assertIn(f"({lines} rows)", out.getvalue())
+        self.assertNotIn("First", out.getvalue())
+
+    def test_unknown_organization_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, "Organization not found: 0"):
+            call_command("rebuild_reporting_lines", organization=0, stdout=StringIO())
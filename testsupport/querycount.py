@@ -0,0 +1,98 @@
+"""
+Query-count regression harness shared by the apps' test suites.
+
+QueryCountScalingTestCase renders a set of pages for a role against a small
+and a large synthetic organization and asserts that the number of SQL
+queries is the same for both, so an N+1 introduced in a view, template or
+ModelAdmin fails CI. Subclasses implement pages().
+"""
+from abc import ABCMeta, abstractmethod
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.access import ROLE_EMPLOYEE
+from hr_core.models import DocumentToken, Employee, EmployeeDocument
+from platform_core.synthetic import generate_organization
+
+
+SUPERUSER = "superuser"
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryCountScalingTestCase(TestCase, metaclass=ABCMeta):
+    small_size = 10
+    large_size = 200
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+
+    @abstractmethod
+    def pages(self, subject: Employee, document: EmployeeDocument):
+        """[(label, url)] to render; `subject` is an employee the role may see."""
+
+    def build_world(self, size: int):
+        organization, users = generate_organization(
+            f"Scaling {size}",
+            employees=size,
+            seed=size,
+        )
+        # documents per person grow with the size too, for inlines and document lists
+        people = list(Employee.objects.filter(organization=organization).order_by("id")[:3])
+        extra = EmployeeDocument.objects.bulk_create(
+            EmployeeDocument(
+                organization=organization,
+                employee=person,
+                doc_type=EmployeeDocument.DocumentType.OTHER,
+                title=f"Extra {n}",
+                url=f"https://docs.example.com/extra/{person.pk}/{n}",
+            )
+            for person in people
+            for n in range(size // 10)
+        )
+        DocumentToken.objects.index(extra)
+        return organization, users, people
+
+    def measure(self, role: str, size: int):
+        organization, users, people = self.build_world(size)
+
+        if role == SUPERUSER:
+            user = get_user_model().objects.filter(is_superuser=True).first()
+            if user is None:
+                user = get_user_model().objects.create_superuser("scaling-su", "su@example.com", None)
+            subject = people[1]
+        else:
+            user = users[role]
+            subject = Employee.objects.get(user=user) if role == ROLE_EMPLOYEE else people[1]
+        document = subject.documents.order_by("id").first()
+
+        self.client.force_login(user)
+        counts = {}
+        for label, url in self.pages(subject, document):
+            caches["default"].clear()
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            counts[label] = (response.status_code, len(captured))
+        return counts
+
+    def assertQueryCountsStable(self, role: str):
+        small = self.measure(role, self.small_size)
+        large = self.measure(role, self.large_size)
+
+        changed = {
+            label: (small[label], large[label])
+            for label in small
+            if small[label] != large[label]
+        }
+        self.assertFalse(
+            changed,
+            f"{role}: (status, queries) at {self.small_size} vs {self.large_size} employees differ: {changed}",
+        )
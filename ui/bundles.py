@@ -0,0 +1,126 @@
+"""
+Streaming ZIP bundles of EmployeeDocument files.
+
+stream_documents_zip() is a generator of archive bytes: zipfile writes into
+a sink that is drained after every chunk, so there is no temporary file and
+memory stays at about one read chunk plus the deflate window, whatever the
+size of the archive. The sink is not seekable, so zipfile writes each
+entry's sizes and CRC in a data descriptor after its data.
+
+Documents without a file (URL-only), and files missing from storage, are
+listed in a manifest.csv entry at the end of the archive.
+"""
+import csv
+import io
+import os
+import re
+import zipfile
+
+from django.conf import settings
+from django.db.models import Q
+
+
+MANIFEST_HEADER = ("employee_id", "employee", "document_id", "type", "title", "identifier", "issued_date", "url", "note")
+
+_UNSAFE = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, non-seekable buffer that hands its contents over on drain()."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _safe(text: str) -> str:
+    return _UNSAFE.sub("_", text).strip(" .") or "_"
+
+
+def archive_name(document) -> str:
+    employee = document.employee
+    extension = os.path.splitext(document.download_name)[1]
+    return (
+        f"{_safe(f'{employee.last_name} {employee.first_name}')} ({employee.pk})/"
+        f"{_safe(document.get_doc_type_display())} - {_safe(document.title)} ({document.pk}){extension}"
+    )
+
+
+def _manifest_row(document, note=""):
+    employee = document.employee
+    return (
+        employee.pk,
+        str(employee),
+        document.pk,
+        document.doc_type,
+        document.title,
+        document.identifier or "",
+        document.issued_date or "",
+        document.url or "",
+        note,
+    )
+
+
+def stream_documents_zip(documents):
+    """
+    Archive bytes for `documents`, an already scoped EmployeeDocument
+    queryset. Rows are read with iterator(), files in
+    DOCUMENT_DOWNLOAD_CHUNK_SIZE chunks.
+    """
+    chunk_size = settings.DOCUMENT_DOWNLOAD_CHUNK_SIZE
+    documents = documents.select_related("employee").only(
+        "id",
+        "doc_type",
+        "title",
+        "identifier",
+        "issued_date",
+        "file",
+        "file_name",
+        "url",
+        "employee",
+        "employee__first_name",
+        "employee__last_name",
+    ).order_by("employee__last_name", "employee__first_name", "employee_id", "id")
+
+    sink = _Sink()
+    missing = []
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for document in documents.exclude(file="").exclude(file__isnull=True).iterator(chunk_size=500):
+            try:
+                source = document.file.open("rb")
+            except FileNotFoundError:
+                missing.append(document)
+                continue
+
+            # sizes are only known afterwards, so allow > 4 GiB entries up front
+            with source, archive.open(archive_name(document), "w", force_zip64=True) as target:
+                while chunk := source.read(chunk_size):
+                    target.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+
+        with archive.open("manifest.csv", "w") as target:
+            text = io.TextIOWrapper(target, encoding="utf-8", newline="")
+            writer = csv.writer(text)
+            writer.writerow(MANIFEST_HEADER)
+            for document in missing:
+                writer.writerow(_manifest_row(document, "file missing from storage"))
+            url_only = documents.filter(Q(file__isnull=True) | Q(file="")).exclude(url__isnull=True).exclude(url="")
+            for document in url_only.iterator(chunk_size=500):
+                writer.writerow(_manifest_row(document, "link only"))
+                text.flush()
+                yield sink.drain()
+            text.flush()
+            text.detach()
+    yield sink.drain()
@@ -0,0 +1,77 @@
+"""
+ETag / Last-Modified support for the ui pages.
+
+Validators are built from cheap aggregates (Max("updated_at") and row counts)
+over the viewer's scoped querysets, so a poll that changes nothing is
+answered with 304 without running the page queries or rendering a template.
+The ETag also covers the viewer's scope and the query string (cursors, page
+size). Deletions only change counts, so the ETag is the authoritative
+validator; Last-Modified is provided for clients that only send
+If-Modified-Since.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from accounts.access import get_access
+
+from .detail_cache import access_scope
+
+
+def summarize(queryset, *fields):
+    """(Max(updated_at), count) of a queryset, plus Max() of any extra `fields`."""
+    aggregates = {"updated": Max("updated_at"), "rows": Count("pk")}
+    aggregates.update({f"max_{i}": Max(field) for i, field in enumerate(fields)})
+    return tuple(queryset.order_by().aggregate(**aggregates).values())
+
+
+def _validators(request, compute, args, kwargs):
+    if not hasattr(request, "_ui_validators"):
+        access = get_access(request)
+        parts = compute(request, access, *args, **kwargs)
+        if parts is None:
+            request._ui_validators = (None, None)
+        else:
+            stamps = [p for p in _flatten(parts) if hasattr(p, "timestamp")]
+            seed = repr((access_scope(access), request.get_full_path(), parts))
+            request._ui_validators = (
+                hashlib.md5(seed.encode(), usedforsecurity=False).hexdigest(),
+                max(stamps) if stamps else None,
+            )
+    return request._ui_validators
+
+
+def _flatten(parts):
+    for part in parts:
+        if isinstance(part, (tuple, list)):
+            yield from _flatten(part)
+        else:
+            yield part
+
+
+def scoped_condition(compute):
+    """
+    Make a view answer conditional GETs.
+
+    `compute(request, access, *args, **kwargs)` returns the aggregates the page
+    depends on, or None when there is nothing to validate (e.g. a 404).
+    """
+
+    def etag(request, *args, **kwargs):
+        return _validators(request, compute, args, kwargs)[0]
+
+    def last_modified(request, *args, **kwargs):
+        return _validators(request, compute, args, kwargs)[1]
+
+    def decorator(view):
+        # private + no-cache: browsers may keep the page but must revalidate
+        return wraps(view)(
+            cache_control(private=True, no_cache=True)(
+                condition(etag_func=etag, last_modified_func=last_modified)(view)
+            )
+        )
+
+    return decorator
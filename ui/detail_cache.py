@@ -0,0 +1,68 @@
+"""
+Cache-aside storage for the rendered employee detail fragment.
+
+Entries are keyed by employee id, the viewer's access scope and a
+per-employee version token. Invalidation drops the version token, which
+orphans every scope's entry for that employee at once without having to
+enumerate keys (the cache framework cannot delete by pattern).
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _cache():
+    return caches[settings.UI_DETAIL_CACHE_ALIAS]
+
+
+def _version_key(employee_id) -> str:
+    return f"ui:employee_detail:v:{employee_id}"
+
+
+def access_scope(access):
+    """
+    What the viewer is allowed to see, as a cache-key fragment.
+
+    An entry is only ever written after the scoped lookup succeeded, so a hit
+    under the same scope implies the viewer may see the employee.
+    """
+    if access.is_superuser:
+        return "all"
+    if access.employee is None:
+        return None
+    if access.is_employee_role:
+        return f"self:{access.employee_id}"
+    return f"org:{access.organization_id}"
+
+
+def get_fragment(employee_id, access):
+    scope = access_scope(access)
+    if scope is None:
+        return None
+
+    cache = _cache()
+    version = cache.get(_version_key(employee_id))
+    if version is None:
+        return None
+    return cache.get(f"ui:employee_detail:{employee_id}:{scope}:{version}")
+
+
+def set_fragment(employee_id, access, html: str) -> None:
+    scope = access_scope(access)
+    if scope is None:
+        return
+
+    cache = _cache()
+    timeout = settings.UI_DETAIL_CACHE_TIMEOUT
+    version_key = _version_key(employee_id)
+    cache.add(version_key, uuid.uuid4().hex, timeout)
+    version = cache.get(version_key)
+    if version is not None:
+        cache.set(f"ui:employee_detail:{employee_id}:{scope}:{version}", html, timeout)
+
+
+def invalidate(employee_ids) -> None:
+    keys = [_version_key(pk) for pk in set(employee_ids) if pk is not None]
+    if keys:
+        _cache().delete_many(keys)
@@ -0,0 +1,116 @@
+"""
+Responses for EmployeeDocument.file downloads.
+
+file_response() streams the file in chunks and answers single-range
+requests ("bytes=0-1023", "bytes=1024-", "bytes=-500") with 206 Partial
+Content, so large scans can be resumed; If-Range is honoured against the
+ETag. Multi-range requests get the whole file, which RFC 9110 allows.
+
+With DOCUMENT_SENDFILE_HEADER set, the view only authorizes: the bytes
+(and the Range handling) are left to the front web server through
+"X-Accel-Redirect" (nginx, path under DOCUMENT_SENDFILE_PREFIX) or
+"X-Sendfile" (Apache/lighttpd, absolute path).
+"""
+import hashlib
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int):
+    """
+    (start, end) inclusive for a single satisfiable range, None to send
+    the whole file, or ValueError when the range cannot be satisfied.
+    """
+    match = _RANGE.match(header.strip()) if header else None
+    if match is None:
+        # absent, multi-range or not "bytes": full response
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # suffix: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _read(fh, start: int, length: int, chunk_size: int):
+    try:
+        fh.seek(start)
+        while length > 0:
+            data = fh.read(min(chunk_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        fh.close()
+
+
+def file_etag(fieldfile, size: int) -> str:
+    return '"%s"' % hashlib.md5(f"{fieldfile.name}:{size}".encode()).hexdigest()
+
+
+def file_response(request, fieldfile, filename: str):
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    disposition = content_disposition_header(True, filename)
+
+    header = settings.DOCUMENT_SENDFILE_HEADER
+    if header:
+        response = HttpResponse(content_type=content_type)
+        if header == "X-Accel-Redirect":
+            response[header] = quote(settings.DOCUMENT_SENDFILE_PREFIX + fieldfile.name)
+        else:
+            response[header] = fieldfile.path
+        response["Content-Disposition"] = disposition
+        return response
+
+    size = fieldfile.size
+    etag = file_etag(fieldfile, size)
+
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if if_range is None or if_range == etag:
+        try:
+            byte_range = parse_range(request.headers.get("Range", ""), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    fh = fieldfile.open("rb")
+    if byte_range is None:
+        response = FileResponse(fh, as_attachment=True, filename=filename, content_type=content_type)
+        response.block_size = settings.DOCUMENT_DOWNLOAD_CHUNK_SIZE
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _read(fh, start, length, settings.DOCUMENT_DOWNLOAD_CHUNK_SIZE),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(length)
+        response["Content-Disposition"] = disposition
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    return response
@@ -0,0 +1,103 @@
+from django.db.models import F
+from django.urls import reverse
+
+from hr_core.models import ReportingLine
+
+
+CHART_FIELDS = (
+    "id",
+    "first_name",
+    "last_name",
+    "manager",
+    "position",
+    "position__name",
+)
+
+
+def chart_roots(employees, access):
+    """Where the chart starts: the tops of the trees, or the user's own row for the EMPLOYEE role."""
+    if access.is_employee_role and not access.is_superuser:
+        # for_access() leaves them only themselves
+        return employees
+    return employees.filter(manager__isnull=True)
+
+
+def top_levels(employees, roots, levels: int):
+    """
+    Employees 0..levels-1 steps below `roots`.
+
+    The root ids are fetched first so that the closure rows are read through
+    reporting_ancestor_depth_idx: only the top levels are joined and sorted,
+    however large the organization is.
+    """
+    root_ids = list(roots.values_list("pk", flat=True))
+    return (
+        employees.filter(
+            ancestor_links__ancestor_id__in=root_ids,
+            ancestor_links__depth__lt=levels,
+        )
+        .select_related("position")
+        .only(*CHART_FIELDS)
+        .annotate(level=F("ancestor_links__depth"))
+        .order_by("level", "last_name", "first_name", "id")
+    )
+
+
+def below(employees, root_id, levels: int):
+    """Employees 1..levels steps below root_id."""
+    return (
+        employees.filter(
+            ancestor_links__ancestor_id=root_id,
+            ancestor_links__depth__gte=1,
+            ancestor_links__depth__lte=levels,
+        )
+        .select_related("position")
+        .only(*CHART_FIELDS)
+        .annotate(level=F("ancestor_links__depth"))
+        .order_by("level", "last_name", "first_name", "id")
+    )
+
+
+def build_chart(rows, max_nodes: int):
+    """
+    Turn an ordered, level-annotated queryset into nested node dicts.
+
+    At most max_nodes rows are fetched, and their report counts are the
+    stored counters on the depth-0 closure rows (one indexed lookup per
+    node), so the cost of a request follows the number of visible nodes,
+    not the size of the tree.
+    """
+    rows = list(rows[: max_nodes + 1])
+    truncated = len(rows) > max_nodes
+    rows = rows[:max_nodes]
+
+    counts = {
+        ancestor_id: (direct, total)
+        for ancestor_id, direct, total in ReportingLine.objects.filter(
+            ancestor_id__in=[e.pk for e in rows], depth=0
+        ).values_list("ancestor_id", "direct_reports", "total_reports")
+    }
+
+    nodes = {}
+    for e in rows:
+        direct, total = counts.get(e.pk, (0, 0))
+        nodes[e.pk] = {
+            "id": e.pk,
+            "name": str(e),
+            "position": e.position.name if e.position else None,
+            "url": reverse("ui:employee_detail", args=[e.pk]),
+            "direct_reports": direct,
+            "total_reports": total,
+            "children": [],
+        }
+
+    roots = []
+    for e in rows:
+        parent = nodes.get(e.manager_id)
+        (parent["children"] if parent else roots).append(nodes[e.pk])
+
+    for node in nodes.values():
+        # children beyond the rendered depth are fetched on demand
+        node["expandable"] = node["direct_reports"] > len(node["children"])
+
+    return roots, truncated
@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from hr_core.models import Department, Employee, EmployeeDocument, Position
+from hr_core.signals import employees_updated
+from platform_core.models import Organization
+
+from . import detail_cache
+
+
+def _invalidate_on_commit(employee_ids):
+    employee_ids = list(employee_ids)
+    if employee_ids:
+        # after commit, so a concurrent reader cannot re-cache the old row
+        transaction.on_commit(lambda: detail_cache.invalidate(employee_ids))
+
+
+def _affected_by_employee(instance: Employee):
+    # subordinates render this employee as their manager
+    return [instance.pk, *Employee.objects.filter(manager_id=instance.pk).values_list("pk", flat=True)]
+
+
+@receiver(post_save, sender=Employee)
+def employee_saved(sender, instance: Employee, **kwargs):
+    _invalidate_on_commit(_affected_by_employee(instance))
+
+
+@receiver(employees_updated)
+def employees_bulk_updated(sender, employee_ids, **kwargs):
+    _invalidate_on_commit(employee_ids)
+
+
+@receiver(post_save, sender=EmployeeDocument)
+@receiver(post_delete, sender=EmployeeDocument)
+def document_changed(sender, instance: EmployeeDocument, **kwargs):
+    _invalidate_on_commit([instance.employee_id])
+
+
+@receiver(post_save, sender=Department)
+def department_saved(sender, instance: Department, **kwargs):
+    _invalidate_on_commit(instance.employees.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Position)
+def position_saved(sender, instance: Position, **kwargs):
+    _invalidate_on_commit(instance.employees.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Organization)
+def organization_saved(sender, instance: Organization, created, **kwargs):
+    # the fragment renders the organization name
+    if not created:
+        _invalidate_on_commit(Employee.objects.filter(organization=instance).values_list("pk", flat=True))
+
+
+# Deleting an employee, department or position SET_NULLs the references to
+# it, so the affected ids have to be collected before the delete runs.
+
+@receiver(pre_delete, sender=Employee)
+def employee_deleting(sender, instance: Employee, **kwargs):
+    instance._detail_cache_ids = _affected_by_employee(instance)
+
+
+@receiver(pre_delete, sender=Department)
+@receiver(pre_delete, sender=Position)
+def org_structure_deleting(sender, instance, **kwargs):
+    instance._detail_cache_ids = list(instance.employees.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Employee)
+@receiver(post_delete, sender=Department)
+@receiver(post_delete, sender=Position)
+def structure_deleted(sender, instance, **kwargs):
+    _invalidate_on_commit(getattr(instance, "_detail_cache_ids", ()))
@@ -1,3 +1,659 @@
-from django.test import TestCase
+import base64
+import csv
+import io
+import json
+import os
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.access import ROLE_EMPLOYEE, ROLE_HR_MANAGER, ROLE_ORG_ADMIN
+from hr_core.models import Department, Employee, EmployeeDocument, HeadcountSnapshot, Position
+from platform_core.synthetic import generate_organization
+from testsupport.querycount import SUPERUSER, QueryCountScalingTestCase
+from ui import org_chart as chart
+from ui.views import EMPLOYEE_EXPORT_HEADER
+
+
+class UiQueryCountTests(QueryCountScalingTestCase):
+    def pages(self, subject, document):
+        return [
+            ("employee_list", reverse("ui:employee_list")),
+            ("employee_list_page_size", reverse("ui:employee_list") + "?page_size=500"),
+            ("employee_export", reverse("ui:employee_export")),
+            ("employee_search", reverse("ui:employee_search") + "?q=a&limit=50"),
+            ("document_search", reverse("ui:document_search") + "?q=o"),
+            ("document_search_page", reverse("ui:document_search") + "?q=o&page=2"),
+            ("employee_detail", reverse("ui:employee_detail", args=[subject.pk])),
+            ("employee_documents_zip", reverse("ui:employee_documents_zip", args=[subject.pk])),
+            ("department_documents_zip", reverse("ui:department_documents_zip", args=[subject.department_id])),
+            ("department_list", reverse("ui:department_list")),
+            ("position_list", reverse("ui:position_list")),
+            ("org_chart", reverse("ui:org_chart")),
+            ("org_chart_children", reverse("ui:org_chart_children", args=[subject.pk])),
+            ("headcount_dashboard", reverse("ui:headcount_dashboard")),
+        ]
+
+    def test_superuser(self):
+        self.assertQueryCountsStable(SUPERUSER)
+
+    def test_org_admin(self):
+        self.assertQueryCountsStable(ROLE_ORG_ADMIN)
+
+    def test_hr_manager(self):
+        self.assertQueryCountsStable(ROLE_HR_MANAGER)
+
+    def test_employee(self):
+        self.assertQueryCountsStable(ROLE_EMPLOYEE)
+
+
+class EmployeeListPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Pages", employees=23, seed=1)
+        generate_organization("Other", employees=5, seed=2)
+        cls.expected = list(
+            Employee.objects.filter(organization=cls.organization)
+            .order_by("last_name", "first_name", "id")
+            .values_list("pk", flat=True)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+
+    def page(self, **params):
+        response = self.client.get(reverse("ui:employee_list"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.context["page"]
+
+    def test_walks_forward_and_back(self):
+        pages = [self.page(page_size=5)]
+        self.assertFalse(pages[0].has_previous)
+        while pages[-1].has_next:
+            pages.append(self.page(page_size=5, after=pages[-1].next_cursor))
+
+        self.assertEqual([len(p) for p in pages], [5, 5, 5, 5, 3])
+        self.assertEqual([e.pk for p in pages for e in p], self.expected)
+
+        # back from the last page with `before`
+        back = [pages[-1]]
+        while back[-1].has_previous:
+            back.append(self.page(page_size=5, before=back[-1].prev_cursor))
+        self.assertEqual([[e.pk for e in p] for p in reversed(back)], [[e.pk for e in p] for p in pages])
+        self.assertTrue(back[-1].has_next)
+
+    @override_settings(UI_EMPLOYEE_PAGE_SIZE=4, UI_MAX_PAGE_SIZE=10)
+    def test_page_size_is_clamped(self):
+        for page_size, expected in (("0", 1), ("-3", 1), ("7", 7), ("500", 10), ("abc", 4)):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(len(self.page(page_size=page_size)), expected)
+
+    def test_malformed_cursors_are_rejected(self):
+        def cursor(values):
+            return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+        for bad in (
+            "not base64!",
+            cursor({"a": 1}),
+            cursor(["a", "b"]),
+            cursor(["a", "b", "x"]),
+            cursor([None, None, None]),
+            cursor(["a", ["b"], 1]),
+            cursor(["a", "b", True]),
+        ):
+            for direction in ("after", "before"):
+                with self.subTest(cursor=bad, direction=direction):
+                    response = self.client.get(reverse("ui:employee_list"), {direction: bad})
+                    self.assertEqual(response.status_code, 400)
+
+
+class EmployeeExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Export", employees=12, seed=1)
+        cls.other, _ = generate_organization("Elsewhere", employees=5, seed=2)
+        cls.url = reverse("ui:employee_export")
+
+    def export(self, user):
+        self.client.force_login(user)
+        response = self.client.get(self.url)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        return response
+
+    def rows(self, response):
+        return list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+    def test_header_is_streamed_before_any_row_is_read(self):
+        chunks = iter(self.export(self.users[ROLE_HR_MANAGER]).streaming_content)
+
+        with self.assertNumQueries(0):
+            header = next(chunks)
+        self.assertEqual(next(csv.reader([header.decode()])), list(EMPLOYEE_EXPORT_HEADER))
+
+    def test_rows_cover_the_organization_only(self):
+        header, *rows = self.rows(self.export(self.users[ROLE_HR_MANAGER]))
+
+        self.assertEqual(header, list(EMPLOYEE_EXPORT_HEADER))
+        employees = Employee.objects.filter(organization=self.organization)
+        self.assertEqual(sorted(int(row[0]) for row in rows), sorted(employees.values_list("pk", flat=True)))
+
+        employee = employees.filter(manager__isnull=False, department__isnull=False).select_related(
+            "department", "position", "manager"
+        ).first()
+        [row] = [row for row in rows if row[0] == str(employee.pk)]
+        self.assertEqual(
+            row,
+            [
+                str(employee.pk),
+                "Export",
+                employee.last_name,
+                employee.first_name,
+                employee.employment_status,
+                employee.employment_type,
+                employee.department.name,
+                employee.position.name if employee.position else "",
+                f"{employee.manager.last_name} {employee.manager.first_name}",
+            ],
+        )
+
+    def test_employee_role_exports_only_themselves(self):
+        user = self.users[ROLE_EMPLOYEE]
+        header, *rows = self.rows(self.export(user))
+
+        self.assertEqual([int(row[0]) for row in rows], [Employee.objects.get(user=user).pk])
+
+
+class EmployeeSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Search", employees=30, seed=1)
+        cls.other, _ = generate_organization("Other", employees=30, seed=2)
+        cls.jose = Employee.objects.create(organization=cls.organization, first_name="José", last_name="García")
+        Employee.objects.create(organization=cls.other, first_name="Jose", last_name="Garcia")
+
+    def setUp(self):
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+
+    def search(self, q, **params):
+        response = self.client.get(reverse("ui:employee_search"), {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_matches_either_name_order_ignoring_case_and_accents(self):
+        self.assertEqual(self.search("JOSE gar"), [self.jose.pk])
+        self.assertEqual(self.search("garcía  j"), [self.jose.pk])
+        # one prefix over the whole key: only the last word may be partial
+        self.assertIn(self.jose.pk, self.search("garc", limit=50))
+        self.assertEqual(self.search("garc jo"), [])
+
+    def test_results_are_limited_and_scoped(self):
+        ids = self.search("", limit=5) + self.search("a", limit=5)
+
+        self.assertLessEqual(len(ids), 5)
+        self.assertEqual(
+            set(Employee.objects.filter(pk__in=ids).values_list("organization_id", flat=True)),
+            {self.organization.pk},
+        )
+
+    def test_keys_follow_renames(self):
+        self.jose.last_name = "Lopez"
+        self.jose.save(update_fields=["last_name"])
+
+        self.assertEqual(self.search("lopez jose"), [self.jose.pk])
+        self.assertNotIn(self.jose.pk, self.search("jose garcia"))
+
+
+class DocumentSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Docs", employees=10, documents_per_employee=0, seed=1)
+        cls.other, other_users = generate_organization("Other", employees=10, documents_per_employee=0, seed=2)
+        cls.me = Employee.objects.get(user=cls.users[ROLE_EMPLOYEE])
+        colleague = Employee.objects.filter(organization=cls.organization).exclude(pk=cls.me.pk).first()
+        stranger = Employee.objects.filter(organization=cls.other).first()
+
+        def document(employee, title, **fields):
+            return EmployeeDocument.objects.create(
+                organization=employee.organization,
+                employee=employee,
+                doc_type=fields.pop("doc_type", EmployeeDocument.DocumentType.OTHER),
+                title=title,
+                url="https://docs.example.com/x",
+                **fields,
+            )
+
+        cls.title_hit = document(colleague, "Employment contract", doc_type=EmployeeDocument.DocumentType.CONTRACT)
+        cls.notes_hit = document(colleague, "Scan", notes="Signed contract, renewal pending")
+        cls.mine = document(cls.me, "Contract addendum", doc_type=EmployeeDocument.DocumentType.ADDENDUM)
+        cls.foreign = document(stranger, "Contract")
+
+    def search(self, role, q):
+        self.client.force_login(self.users[role])
+        response = self.client.get(reverse("ui:document_search"), {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return [r["document"].pk for r in response.context["results"]]
+
+    def test_ranked_and_scoped_to_the_organization(self):
+        ids = self.search(ROLE_HR_MANAGER, "contract")
+
+        # title + doc type beats notes; other organizations never match
+        self.assertEqual(ids, [self.title_hit.pk, self.mine.pk, self.notes_hit.pk])
+
+    def test_employee_sees_only_own_documents(self):
+        self.assertEqual(self.search(ROLE_EMPLOYEE, "contract"), [self.mine.pk])
+
+    def test_all_terms_must_match_as_prefixes(self):
+        self.assertEqual(self.search(ROLE_HR_MANAGER, "renew SIGN"), [self.notes_hit.pk])
+        self.assertEqual(self.search(ROLE_HR_MANAGER, "renewal passport"), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.notes_hit.notes = "Nothing here"
+        self.notes_hit.save()
+        self.title_hit.delete()
+
+        self.assertEqual(self.search(ROLE_HR_MANAGER, "contract"), [self.mine.pk])
+
+
+class OrgChartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Chart", employees=60, span=4, seed=1)
+
+    def test_report_counts_come_from_the_stored_counters(self):
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+        response = self.client.get(reverse("ui:org_chart"))
+
+        self.assertEqual(response.status_code, 200)
+        [root] = response.context["roots"]
+        # heap-shaped tree: everyone reports to the first employee
+        self.assertEqual((root["direct_reports"], root["total_reports"]), (4, 59))
+        for child in root["children"]:
+            employee = Employee.objects.get(pk=child["id"])
+            self.assertEqual(child["direct_reports"], Employee.objects.reports_of(employee, direct_only=True).count())
+            self.assertEqual(child["total_reports"], Employee.objects.reports_of(employee).count())
+
+
+    def test_top_levels_do_not_read_deeper_employees(self):
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+        url = reverse("ui:org_chart")
+
+        def chart_queries():
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url)
+            return response, [q["sql"] for q in captured if '"hr_core_' in q["sql"]]
+
+        response, before = chart_queries()
+        manager = Employee.objects.filter(organization=self.organization).order_by("-id").first()
+        for n in range(20):
+            manager = Employee.objects.create(
+                organization=self.organization, first_name="Deep", last_name=f"Report {n}", manager=manager
+            )
+        deeper, after = chart_queries()
+
+        self.assertEqual(after, before)
+        def visible(nodes):
+            return [(node["id"], visible(node["children"])) for node in nodes]
+
+        self.assertEqual(visible(deeper.context["roots"]), visible(response.context["roots"]))
+
+        employees = Employee.objects.filter(organization=self.organization)
+        plan = chart.top_levels(employees, employees.filter(manager__isnull=True), 2).explain()
+        self.assertIn("reporting_ancestor_depth_idx", plan)
+        self.assertNotIn("SCAN", plan)
+
+    def test_employee_role_sees_themselves(self):
+        user = self.users[ROLE_EMPLOYEE]
+        self.client.force_login(user)
+        response = self.client.get(reverse("ui:org_chart"))
+
+        [root] = response.context["roots"]
+        self.assertEqual(root["id"], Employee.objects.get(user=user).pk)
+        self.assertEqual(root["children"], [])
+
+class EmployeeDetailConditionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Conditional", employees=5, seed=1)
+        cls.employee = Employee.objects.filter(organization=cls.organization).order_by("id")[1]
+        cls.url = reverse("ui:employee_detail", args=[cls.employee.pk])
+
+    def setUp(self):
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+
+    def revalidate(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        return etag
+
+    def assertChanged(self, etag, text):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, text)
+
+    def test_edited_document_is_served_fresh(self):
+        etag = self.revalidate()
+        document = self.employee.documents.get()
+        document.title = "Renamed document"
+        with self.captureOnCommitCallbacks(execute=True):
+            document.save()
+
+        self.assertChanged(etag, "Renamed document")
+
+    def test_renamed_organization_is_served_fresh(self):
+        etag = self.revalidate()
+        self.organization.name = "Renamed organization"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organization.save()
+
+        self.assertChanged(etag, "Renamed organization")
+
+
+class ListConditionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Conditional", employees=5, seed=1)
+
+    def setUp(self):
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+
+    def assertRenameServedFresh(self, url):
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.organization.name = "Renamed organization"
+        self.organization.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Renamed organization")
+
+    def test_employee_list_after_organization_rename(self):
+        self.assertRenameServedFresh(reverse("ui:employee_list"))
+
+    def test_department_list_after_organization_rename(self):
+        self.assertRenameServedFresh(reverse("ui:department_list"))
+
+    def test_position_list_after_organization_rename(self):
+        self.assertRenameServedFresh(reverse("ui:position_list"))
+
+
+class DocumentDownloadTests(TestCase):
+    payload = bytes(range(256)) * 40
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media = tempfile.TemporaryDirectory()
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media.name, DOCUMENT_DOWNLOAD_CHUNK_SIZE=1000))
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media.cleanup()
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Files", employees=5, documents_per_employee=0, seed=1)
+        owner = Employee.objects.filter(organization=cls.organization).exclude(user=cls.users[ROLE_EMPLOYEE]).first()
+        cls.document = EmployeeDocument(
+            organization=cls.organization,
+            employee=owner,
+            doc_type=EmployeeDocument.DocumentType.ID,
+            title="Passport scan",
+        )
+        cls.document.file.save("scan.pdf", ContentFile(cls.payload))
+        cls.link = EmployeeDocument.objects.create(
+            organization=cls.organization,
+            employee=owner,
+            doc_type=EmployeeDocument.DocumentType.CONTRACT,
+            title="Signed contract",
+            url="https://docs.example.com/contract",
+        )
+        cls.url = reverse("ui:document_download", args=[cls.document.pk])
+
+    def setUp(self):
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+
+    def test_streams_the_whole_file(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Length"], str(len(self.payload)))
+        self.assertIn("attachment", response["Content-Disposition"])
+        self.assertEqual(b"".join(response.streaming_content), self.payload)
+
+    def test_ranges(self):
+        cases = {
+            "bytes=100-2099": (100, 2099),
+            "bytes=10000-": (10000, len(self.payload) - 1),
+            "bytes=-24": (len(self.payload) - 24, len(self.payload) - 1),
+            "bytes=10000-99999": (10000, len(self.payload) - 1),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{len(self.payload)}")
+                self.assertEqual(b"".join(response.streaming_content), self.payload[start : end + 1])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.payload)}-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.payload)}")
+
+    def test_stale_if_range_gets_the_whole_file(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_missing_blob_is_not_found(self):
+        path = self.document.file.path
+        os.rename(path, path + ".moved")
+        self.addCleanup(os.rename, path + ".moved", path)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_scoped(self):
+        self.client.force_login(self.users[ROLE_EMPLOYEE])
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def read_zip(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        return zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+
+    def test_employee_bundle(self):
+        owner = self.document.employee
+        archive = self.read_zip(reverse("ui:employee_documents_zip", args=[owner.pk]))
+
+        self.assertIsNone(archive.testzip())
+        files = [name for name in archive.namelist() if name != "manifest.csv"]
+        self.assertEqual(files, [f"{owner.last_name} {owner.first_name} ({owner.pk})/ID _ Passport - Passport scan ({self.document.pk}).pdf"])
+        self.assertEqual(archive.read(files[0]), self.payload)
+
+        manifest = list(csv.DictReader(io.StringIO(archive.read("manifest.csv").decode())))
+        self.assertEqual([(row["document_id"], row["url"]) for row in manifest], [(str(self.link.pk), self.link.url)])
+
+    def test_department_bundle_is_scoped(self):
+        department = self.document.employee.department
+        url = reverse("ui:department_documents_zip", args=[department.pk])
+
+        self.assertEqual(len(self.read_zip(url).namelist()), 2)
+
+        # EMPLOYEE only ever gets their own documents
+        self.client.force_login(self.users[ROLE_EMPLOYEE])
+        self.assertEqual(self.read_zip(url).namelist(), ["manifest.csv"])
+
+        other, users = generate_organization("Elsewhere", employees=3, seed=3)
+        self.client.force_login(users[ROLE_HR_MANAGER])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    @override_settings(DOCUMENT_SENDFILE_HEADER="X-Accel-Redirect")
+    def test_hands_off_to_the_web_server(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/" + self.document.file.name)
+        self.assertEqual(response.content, b"")
+
+
+class HeadcountTests(TestCase):
+    day = date(2026, 3, 10)
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("setup_roles", stdout=StringIO())
+        cls.organization, cls.users = generate_organization("Headcount", employees=40, documents_per_employee=0, seed=1)
+        cls.other, _ = generate_organization("Other", employees=15, documents_per_employee=0, seed=2)
+        cls.employees = Employee.objects.filter(organization=cls.organization)
+
+    def materialize(self, day, **options):
+        out = StringIO()
+        call_command("materialize_headcount", date=day, organization=self.organization.pk, stdout=out, **options)
+        return out.getvalue()
+
+    def totals(self):
+        return dict(HeadcountSnapshot.objects.filter(organization=self.organization).totals(date.min, date.max))
+
+    def current(self):
+        return self.employees.exclude(employment_status=Employee.EmploymentStatus.TERMINATED).count()
+
+    def test_copies_forward_until_employees_change(self):
+        self.assertIn("aggregated", self.materialize(self.day))
+        self.assertIn("unchanged", self.materialize(self.day))
+        # two days skipped and no changes: carried forward without aggregating
+        self.assertIn("copied", self.materialize(self.day + timedelta(days=3)))
+
+        hired = Employee.objects.create(organization=self.organization, first_name="New", last_name="Hire")
+        self.assertIn("aggregated", self.materialize(self.day + timedelta(days=4)))
+        hired.delete()
+        self.assertIn("aggregated", self.materialize(self.day + timedelta(days=5)))
+
+        before = self.current()
+        self.assertEqual(
+            self.totals(),
+            {
+                self.day: before,
+                self.day + timedelta(days=1): before,
+                self.day + timedelta(days=2): before,
+                self.day + timedelta(days=3): before,
+                self.day + timedelta(days=4): before + 1,
+                self.day + timedelta(days=5): before,
+            },
+        )
+        self.assertFalse(HeadcountSnapshot.objects.filter(organization=self.other).exists())
+
+    def test_department_and_position_changes_are_aggregated(self):
+        tomorrow = self.day + timedelta(days=1)
+        department = Department.objects.filter(organization=self.organization, employees__isnull=False).first()
+        position = Position.objects.filter(organization=self.organization, employees__isnull=False).first()
+        snapshots = HeadcountSnapshot.objects.filter(organization=self.organization, date=tomorrow)
+
+        self.materialize(self.day)
+        department.name = "Renamed department"
+        department.save()
+        self.assertIn("aggregated", self.materialize(tomorrow))
+        self.assertEqual(
+            set(snapshots.filter(department=department).values_list("department_name", flat=True)),
+            {"Renamed department"},
+        )
+
+        position.name = "Renamed position"
+        position.save()
+        self.assertIn("aggregated", self.materialize(tomorrow))
+        self.assertEqual(
+            set(snapshots.filter(position=position).values_list("position_name", flat=True)),
+            {"Renamed position"},
+        )
+
+        department_id = department.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            department.delete()
+        self.assertIn("aggregated", self.materialize(tomorrow))
+        self.assertFalse(snapshots.filter(department_id=department_id).exists())
+        self.assertFalse(snapshots.filter(department_name="Renamed department").exists())
+        self.assertEqual(
+            sum(snapshots.filter(department__isnull=True).values_list("headcount", flat=True)),
+            self.employees.filter(department__isnull=True)
+            .exclude(employment_status=Employee.EmploymentStatus.TERMINATED)
+            .count(),
+        )
+        self.assertEqual(dict(snapshots.totals(tomorrow, tomorrow)), {tomorrow: self.current()})
+
+    def test_backdated_runs_do_not_rewrite_history(self):
+        self.materialize(self.day)
+        Employee.objects.create(organization=self.organization, first_name="New", last_name="Hire")
+
+        self.assertIn("skipped", self.materialize(self.day - timedelta(days=1)))
+        self.assertIn("aggregated", self.materialize(self.day, full=True))
+        self.assertEqual(self.totals(), {self.day: self.current()})
+
+    def test_history_survives_department_deletes(self):
+        self.materialize(self.day)
+        snapshots = HeadcountSnapshot.objects.filter(organization=self.organization)
+        before = snapshots.breakdown(self.day, "department")
+        department = Department.objects.filter(organization=self.organization, employees__isnull=False).first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            department.delete()
+
+        self.assertEqual(snapshots.breakdown(self.day, "department"), before)
+        self.assertIn(department.name, [label for _, label, _ in before])
+
+    def test_one_row_per_group_and_day(self):
+        self.materialize(self.day)
+        row = HeadcountSnapshot.objects.filter(organization=self.organization).first()
+        row.pk = None
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            row.save()
+
+        # employees without a department or position form one group too
+        row.department_id = row.position_id = None
+        row.save()
+        row.pk = None
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            row.save()
+
+    def test_dashboard_reads_only_snapshots(self):
+        self.materialize(self.day)
+        self.client.force_login(self.users[ROLE_HR_MANAGER])
+        url = reverse("ui:headcount_dashboard")
+
+        for group in HeadcountSnapshot.DIMENSIONS:
+            with self.subTest(group), CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url, {"date": "2026-03-31", "group": group})
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context["day"], self.day)
+            self.assertEqual(response.context["total"], self.current())
+            # the only employee row read is the user's own profile (AccessContext)
+            employee_reads = [q["sql"] for q in captured if '"hr_core_employee"' in q["sql"]]
+            self.assertEqual(len(employee_reads), 1)
+            self.assertIn('"hr_core_employee"."user_id" =', employee_reads[0])
+
+        self.client.force_login(self.users[ROLE_EMPLOYEE])
+        self.assertEqual(self.client.get(url).status_code, 403)
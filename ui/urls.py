@@ -6,8 +6,17 @@ app_name = "ui"
 urlpatterns = [
     path("", views.home, name="home"),
     path("employees/", views.employee_list, name="employee_list"),
+    path("employees/export/", views.employee_export, name="employee_export"),
+    path("employees/search/", views.employee_search, name="employee_search"),
     path("employees/<int:pk>/", views.employee_detail, name="employee_detail"),
+    path("employees/<int:pk>/documents.zip", views.employee_documents_zip, name="employee_documents_zip"),
+    path("documents/search/", views.document_search, name="document_search"),
+    path("documents/<int:pk>/download/", views.document_download, name="document_download"),
     path("departments/", views.department_list, name="department_list"),
+    path("departments/<int:pk>/documents.zip", views.department_documents_zip, name="department_documents_zip"),
     path("positions/", views.position_list, name="position_list"),
+    path("org-chart/", views.org_chart, name="org_chart"),
+    path("org-chart/<int:pk>/children/", views.org_chart_children, name="org_chart_children"),
+    path("analytics/headcount/", views.headcount_dashboard, name="headcount_dashboard"),
 
 ]
@@ -1,7 +1,28 @@
-from django.http import Http404
+import csv
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db.models import Count, Max
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render
-from hr_core.models import Employee, EmployeeDocument, Department, Position
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from accounts.access import get_access
+from platform_core.decorators import module_required
+from hr_core.models import DocumentToken, Employee, EmployeeDocument, Department, HeadcountSnapshot, Position
+
+from . import detail_cache
+from .bundles import stream_documents_zip
+from .downloads import file_response
+from .conditional import scoped_condition, summarize
+from . import org_chart as chart
+from .pagination import paginate_keyset
 
 
 
@@ -10,93 +31,403 @@ from hr_core.models import Employee, EmployeeDocument, Department, Position
 def home(request):
     return render(request, "ui/home.html")
 
+EMPLOYEE_LIST_ORDERING = ("last_name", "first_name", "id")
+
+
+def _page_size(request) -> int:
+    try:
+        size = int(request.GET.get("page_size", settings.UI_EMPLOYEE_PAGE_SIZE))
+    except ValueError:
+        size = settings.UI_EMPLOYEE_PAGE_SIZE
+    return max(1, min(size, settings.UI_MAX_PAGE_SIZE))
+
+
+def _employee_list_validators(request, access):
+    # manager names come from employees; department/position names from their
+    # tables; organization names from theirs
+    return (
+        summarize(Employee.objects.for_access(access), "organization__updated_at"),
+        summarize(Department.objects.for_access(access)),
+        summarize(Position.objects.for_access(access)),
+    )
+
+
 @login_required
+@module_required("HR")
+@scoped_condition(_employee_list_validators)
 def employee_list(request):
-    # Superuser: everything (dev only)
-    if request.user.is_superuser:
-        employees = Employee.objects.select_related(
-            "organization", "department", "position", "manager", "user"
-        ).all()
-        return render(request, "ui/employees/list.html", {"employees": employees})
+    access = get_access(request)
+    qs = Employee.objects.for_access(access).directory()
 
-    me = getattr(request.user, "employee_profile", None)
-    if me is None:
-        # no employee profile -> show empty page
-        return render(request, "ui/employees/list.html", {"employees": []})
+    page = paginate_keyset(
+        qs,
+        fields=EMPLOYEE_LIST_ORDERING,
+        page_size=_page_size(request),
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+    )
+    return render(
+        request,
+        "ui/employees/list.html",
+        {"employees": page.object_list, "page": page},
+    )
+
+class _Echo:
+    """File-like object that hands csv.writer output straight back to the caller."""
 
-    qs = Employee.objects.select_related(
-        "organization", "department", "position", "manager", "user"
-    ).filter(organization=me.organization)
+    def write(self, value):
+        return value
 
-    # EMPLOYEE: only self
-    if request.user.groups.filter(name="EMPLOYEE").exists():
-        qs = qs.filter(pk=me.pk)
 
-    return render(request, "ui/employees/list.html", {"employees": qs})
+EMPLOYEE_EXPORT_HEADER = (
+    "ID",
+    "Organization",
+    "Last name",
+    "First name",
+    "Status",
+    "Employment type",
+    "Department",
+    "Position",
+    "Manager",
+)
+
 
 @login_required
-def employee_detail(request, pk: int):
-    # 1) Resolve employee with scoping
-    if request.user.is_superuser:
-        try:
-            employee = Employee.objects.select_related(
-                "organization", "department", "position", "manager", "user"
-            ).get(pk=pk)
-        except Employee.DoesNotExist:
-            raise Http404()
-    else:
-        me = getattr(request.user, "employee_profile", None)
-        if me is None:
-            raise Http404()
+@module_required("HR")
+def employee_export(request):
+    access = get_access(request)
+    qs = Employee.objects.for_access(access).directory().order_by(*EMPLOYEE_LIST_ORDERING)
+    writer = csv.writer(_Echo())
+
+    def rows():
+        # header goes out before the query runs
+        yield writer.writerow(EMPLOYEE_EXPORT_HEADER)
+        for e in qs.iterator(chunk_size=settings.UI_EXPORT_CHUNK_SIZE):
+            yield writer.writerow(
+                [
+                    e.id,
+                    e.organization.name,
+                    e.last_name,
+                    e.first_name,
+                    e.employment_status,
+                    e.employment_type,
+                    e.department.name if e.department else "",
+                    e.position.name if e.position else "",
+                    f"{e.manager.last_name} {e.manager.first_name}" if e.manager else "",
+                ]
+            )
 
-        qs = Employee.objects.select_related(
-            "organization", "department", "position", "manager", "user"
-        ).filter(organization=me.organization)
+    response = StreamingHttpResponse(rows(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = 'attachment; filename="employees.csv"'
+    return response
 
-        # EMPLOYEE: only self
-        if request.user.groups.filter(name="EMPLOYEE").exists():
-            qs = qs.filter(pk=me.pk)
+@login_required
+@module_required("HR")
+def employee_search(request):
+    """Typeahead: top matches for a name prefix as JSON."""
+    access = get_access(request)
+    term = request.GET.get("q", "")
+    try:
+        limit = int(request.GET.get("limit", settings.UI_TYPEAHEAD_LIMIT))
+    except ValueError:
+        limit = settings.UI_TYPEAHEAD_LIMIT
+    limit = max(1, min(limit, settings.UI_TYPEAHEAD_MAX_LIMIT))
+
+    matches = (
+        Employee.objects.for_access(access)
+        .select_related("department", "position")
+        .only(
+            "id",
+            "first_name",
+            "last_name",
+            "search_key",
+            "search_key_rev",
+            "department",
+            "position",
+            "department__name",
+            "position__name",
+        )
+        .typeahead(term, limit)
+    )
+    results = [
+        {
+            "id": e.pk,
+            "name": str(e),
+            "department": e.department.name if e.department else None,
+            "position": e.position.name if e.position else None,
+            "url": reverse("ui:employee_detail", args=[e.pk]),
+        }
+        for e in matches
+    ]
+    return JsonResponse({"q": term, "results": results})
+
+
+@login_required
+@module_required("HR")
+def document_search(request):
+    access = get_access(request)
+    query = request.GET.get("q", "").strip()
+
+    # scoping is part of the token lookup, not a filter on the results
+    hits = DocumentToken.objects.for_access(access).search(query)
+    page = Paginator(hits, settings.UI_DOCUMENT_SEARCH_PAGE_SIZE).get_page(request.GET.get("page"))
+
+    documents = (
+        EmployeeDocument.objects.select_related("employee")
+        .only(
+            "id",
+            "doc_type",
+            "title",
+            "identifier",
+            "issued_date",
+            "employee",
+            "employee__first_name",
+            "employee__last_name",
+        )
+        .in_bulk([hit["document_id"] for hit in page])
+    )
+    results = [
+        {"document": documents[hit["document_id"]], "score": hit["score"]}
+        for hit in page
+        if hit["document_id"] in documents
+    ]
+    return render(
+        request,
+        "ui/documents/search.html",
+        {"query": query, "page": page, "results": results},
+    )
+
+
+@login_required
+@module_required("HR")
+def document_download(request, pk: int):
+    access = get_access(request)
+    try:
+        document = EmployeeDocument.objects.for_access(access).only("id", "file", "file_name").get(pk=pk)
+    except EmployeeDocument.DoesNotExist:
+        raise Http404()
+    if not document.file:
+        raise Http404()
+
+    try:
+        return file_response(request, document.file, document.download_name)
+    except FileNotFoundError:
+        # the row outlived its blob (restored backup, manual cleanup)
+        raise Http404()
+
+
+def _documents_zip_response(documents, filename):
+    response = StreamingHttpResponse(stream_documents_zip(documents), content_type="application/zip")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@module_required("HR")
+def employee_documents_zip(request, pk: int):
+    access = get_access(request)
+    if not Employee.objects.for_access(access).filter(pk=pk).exists():
+        raise Http404()
 
+    documents = EmployeeDocument.objects.for_access(access).filter(employee_id=pk)
+    return _documents_zip_response(documents, f"employee-{pk}-documents.zip")
+
+
+@login_required
+@module_required("HR")
+def department_documents_zip(request, pk: int):
+    access = get_access(request)
+    try:
+        department = Department.objects.for_access(access).only("id", "organization", "path").get(pk=pk)
+    except Department.DoesNotExist:
+        raise Http404()
+
+    # the whole subtree; EMPLOYEE still gets only their own documents
+    documents = EmployeeDocument.objects.for_access(access).filter(
+        employee__in=Employee.objects.in_department(department, include_subtree=True)
+    )
+    return _documents_zip_response(documents, f"department-{pk}-documents.zip")
+
+
+def _employee_detail_validators(request, access, pk):
+    rows = (
+        Employee.objects.for_access(access)
+        .filter(pk=pk)
+        .values_list(
+            "updated_at",
+            "department__updated_at",
+            "position__updated_at",
+            "manager__updated_at",
+            # the organization name is rendered in the fragment
+            "organization__updated_at",
+        )
+        .annotate(
+            document_count=Count("documents"),
+            last_document=Max("documents__updated_at"),
+            last_document_id=Max("documents__id"),
+        )
+        .order_by()
+    )
+    return next(iter(rows), None)  # None -> no validators, the view 404s
+
+
+@login_required
+@module_required("HR")
+@scoped_condition(_employee_detail_validators)
+def employee_detail(request, pk: int):
+    access = get_access(request)
+
+    fragment = detail_cache.get_fragment(pk, access)
+    if fragment is None:
+        # 1) Resolve employee with scoping
         try:
-            employee = qs.get(pk=pk)
+            employee = Employee.objects.for_access(access).with_related().get(pk=pk)
         except Employee.DoesNotExist:
             raise Http404()
 
-    # 2) Documents: always defined
-    documents = EmployeeDocument.objects.filter(employee=employee).order_by("-id")
+        # 2) Documents: always defined
+        documents = EmployeeDocument.objects.filter(employee=employee).order_by("-id")
+
+        fragment = render_to_string(
+            "ui/employees/_detail.html",
+            {"employee": employee, "documents": documents},
+        )
+        # a replica read may predate a write that was just invalidated; caching
+        # it would outlive the writer's pin window
+        if getattr(request, "read_alias", None) is None:
+            detail_cache.set_fragment(pk, access, fragment)
 
     return render(
         request,
         "ui/employees/detail.html",
-        {"employee": employee, "documents": documents},
+        # rendered by us, not user input
+        {"employee_id": pk, "fragment": mark_safe(fragment)},
+    )
+
+def _department_list_validators(request, access):
+    departments = Department.objects.for_access(access)
+    # headcounts change when employees move, which bumps their updated_at
+    return (
+        summarize(departments, "organization__updated_at"),
+        summarize(Employee.objects.filter(department__in=departments.values("pk"))),
     )
 
+
 @login_required
+@module_required("ORG_STRUCTURE")
+@scoped_condition(_department_list_validators)
 def department_list(request):
-    if request.user.is_superuser:
-        departments = Department.objects.select_related("organization", "parent").all()
-        return render(request, "ui/departments/list.html", {"departments": departments})
-
-    me = getattr(request.user, "employee_profile", None)
-    if me is None:
-        return render(request, "ui/departments/list.html", {"departments": []})
+    access = get_access(request)
+    scoped = Department.objects.for_access(access)
+    departments = list(scoped.with_related().order_by("organization_id", "path"))
 
-    departments = Department.objects.select_related("organization", "parent").filter(
-        organization=me.organization
+    # one grouped query for direct headcounts, rolled up along each path
+    direct = dict(
+        Employee.objects.filter(department__in=scoped.values("pk"))
+        .values_list("department_id")
+        .annotate(n=Count("id"))
+        .order_by()
     )
+    subtree = defaultdict(int)
+    for d in departments:
+        for ancestor_id in d.ancestor_ids:
+            subtree[ancestor_id] += direct.get(d.pk, 0)
+    for d in departments:
+        d.headcount = direct.get(d.pk, 0)
+        d.subtree_headcount = subtree[d.pk]
+
     return render(request, "ui/departments/list.html", {"departments": departments})
 
+def _position_list_validators(request, access):
+    return summarize(Position.objects.for_access(access), "organization__updated_at")
+
+
 @login_required
+@module_required("ORG_STRUCTURE")
+@scoped_condition(_position_list_validators)
 def position_list(request):
-    if request.user.is_superuser:
-        positions = Position.objects.select_related("organization").all()
-        return render(request, "ui/positions/list.html", {"positions": positions})
+    access = get_access(request)
+    positions = Position.objects.for_access(access).with_related()
+    return render(request, "ui/positions/list.html", {"positions": positions})
 
-    me = getattr(request.user, "employee_profile", None)
-    if me is None:
-        return render(request, "ui/positions/list.html", {"positions": []})
+@login_required
+@module_required("ORG_STRUCTURE")
+def org_chart(request):
+    access = get_access(request)
+    employees = Employee.objects.for_access(access)
+    levels = settings.UI_ORG_CHART_DEPTH
 
-    positions = Position.objects.select_related("organization").filter(
-        organization=me.organization
+    roots, truncated = chart.build_chart(
+        chart.top_levels(employees, chart.chart_roots(employees, access), levels),
+        settings.UI_ORG_CHART_MAX_NODES,
+    )
+    return render(
+        request,
+        "ui/org_chart.html",
+        {"roots": roots, "truncated": truncated, "levels": levels},
+    )
+
+@login_required
+@module_required("ORG_STRUCTURE")
+def org_chart_children(request, pk: int):
+    access = get_access(request)
+    employees = Employee.objects.for_access(access)
+    if not employees.filter(pk=pk).exists():
+        raise Http404()
+
+    try:
+        depth = int(request.GET.get("depth", 1))
+    except ValueError:
+        depth = 1
+    depth = max(1, min(depth, settings.UI_ORG_CHART_DEPTH))
+
+    children, truncated = chart.build_chart(
+        chart.below(employees, pk, depth),
+        settings.UI_ORG_CHART_MAX_NODES,
+    )
+    return JsonResponse({"id": pk, "children": children, "truncated": truncated})
+
+
+@login_required
+@module_required("HR")
+def headcount_dashboard(request):
+    access = get_access(request)
+    if access.is_employee_role:
+        raise PermissionDenied("Headcount analytics are not available to employees")
+
+    # snapshots only: materialize_headcount does the aggregation over employees
+    snapshots = HeadcountSnapshot.objects.for_access(access)
+    try:
+        as_of = date.fromisoformat(request.GET["date"])
+    except (KeyError, ValueError):
+        as_of = timezone.localdate()
+    day = snapshots.latest_date(on_or_before=as_of)
+
+    group = request.GET.get("group")
+    if group not in HeadcountSnapshot.DIMENSIONS:
+        group = "department"
+
+    breakdown = trend = []
+    if day is not None:
+        choices = {
+            "employment_status": dict(Employee.EmploymentStatus.choices),
+            "employment_type": dict(Employee.EmploymentType.choices),
+        }.get(group, {})
+        breakdown = [
+            (value, choices.get(label, label), headcount)
+            for value, label, headcount in snapshots.breakdown(day, group)
+        ]
+        trend = snapshots.totals(day - timedelta(days=settings.UI_HEADCOUNT_TREND_DAYS - 1), day)
+    return render(
+        request,
+        "ui/analytics/headcount.html",
+        {
+            "day": day,
+            "as_of": as_of,
+            "group": group,
+            "dimensions": [(d, d.replace("_", " ").capitalize()) for d in HeadcountSnapshot.DIMENSIONS],
+            "breakdown": breakdown,
+            "total": sum(row[2] for row in breakdown),
+            "trend": trend,
+        },
     )
-    return render(request, "ui/positions/list.html", {"positions": positions})